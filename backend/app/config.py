@@ -4,69 +4,108 @@ All tunables are documented in .env.example at the repo root.
 """
 
 import os
+from functools import lru_cache
 from pathlib import Path
 from dotenv import load_dotenv
 
-# Load .env from repo root
+# Load .env from repo root, then .env.example as fallback defaults.
+# override=False: values already set (env or earlier file) win.
 _root = Path(__file__).resolve().parent.parent.parent
-load_dotenv(_root / ".env")
-load_dotenv(_root / ".env.example")  # fallback defaults
+for _env_file in (_root / ".env", _root / ".env.example"):
+    if _env_file.is_file():
+        load_dotenv(_env_file, override=False)
+
+# Snapshot the environment once; every setting below reads from this dict
+# instead of going through the os.environ mapping on each lookup.
+_env: dict[str, str] = dict(os.environ)
+
+
+def _get(key: str, default: str) -> str:
+    return _env.get(key, default)
 
 
 # ── Device ────────────────────────────────────────────────
-DEVICE: str = os.getenv("DEVICE", "cpu")
+DEVICE: str = _get("DEVICE", "cpu")
 
 # ── ASR (Qwen3-ASR) ────────────────────────────────────────
 # HuggingFace model id. Options: Qwen/Qwen3-ASR-0.6B (faster), Qwen/Qwen3-ASR-1.7B (better quality)
 # Legacy: if .env has old Whisper size (base/small/medium etc.), use Qwen default
-_asr_env = os.getenv("ASR_MODEL", "Qwen/Qwen3-ASR-0.6B").strip()
+_asr_env = _get("ASR_MODEL", "Qwen/Qwen3-ASR-0.6B").strip()
 _LEGACY_WHISPER_SIZES = {"tiny", "base", "small", "medium", "large", "large-v2", "large-v3"}
 ASR_MODEL: str = (
     "Qwen/Qwen3-ASR-0.6B"
     if _asr_env.lower() in _LEGACY_WHISPER_SIZES
     else _asr_env
 )
-ASR_MAX_NEW_TOKENS: int = int(os.getenv("ASR_MAX_NEW_TOKENS", "256"))
-ASR_MAX_BATCH_SIZE: int = int(os.getenv("ASR_MAX_BATCH_SIZE", "32"))
+ASR_MODEL_SIZE: str = ASR_MODEL  # legacy alias from the Whisper-based config
+ASR_MAX_NEW_TOKENS: int = int(_get("ASR_MAX_NEW_TOKENS", "256"))
+ASR_MAX_BATCH_SIZE: int = int(_get("ASR_MAX_BATCH_SIZE", "32"))
+# auto = bfloat16 on CUDA, int8 dynamic quantization on CPU; or int8/float32/bfloat16/float16
+ASR_COMPUTE_TYPE: str = _get("ASR_COMPUTE_TYPE", "auto")
 
 # ── MT ────────────────────────────────────────────────────
 MT_MODELS: dict[str, str] = {
-    "es-en": os.getenv("MT_MODEL_ES_EN", "Helsinki-NLP/opus-mt-es-en"),
-    "en-es": os.getenv("MT_MODEL_EN_ES", "Helsinki-NLP/opus-mt-en-es"),
+    "es-en": _get("MT_MODEL_ES_EN", "Helsinki-NLP/opus-mt-es-en"),
+    "en-es": _get("MT_MODEL_EN_ES", "Helsinki-NLP/opus-mt-en-es"),
 }
+# "ctranslate2" (int8, converted into MODEL_CACHE_DIR on first load) or "transformers"
+MT_BACKEND: str = _get("MT_BACKEND", "ctranslate2")
+MT_BEAM_SIZE: int = int(_get("MT_BEAM_SIZE", "1"))  # 1 = greedy
+# auto = FP16 on CUDA (transformers) / CTranslate2's default; or float16/float32
+MT_COMPUTE_TYPE: str = _get("MT_COMPUTE_TYPE", "auto")
+# Max segments per batched MT call (concurrent requests for a pair are coalesced)
+MT_MAX_BATCH_SIZE: int = int(_get("MT_MAX_BATCH_SIZE", "16"))
 
 # ── TTS ───────────────────────────────────────────────────
-TTS_ENGINE: str = os.getenv("TTS_ENGINE", "edge-tts")
-TTS_QWEN3_MODEL: str = os.getenv("TTS_QWEN3_MODEL", "Qwen/Qwen3-TTS-0.6B")
-TTS_SAMPLE_RATE: int = int(os.getenv("TTS_SAMPLE_RATE", "24000"))
+TTS_ENGINE: str = _get("TTS_ENGINE", "edge-tts")
+TTS_QWEN3_MODEL: str = _get("TTS_QWEN3_MODEL", "Qwen/Qwen3-TTS-0.6B")
+# auto = float16 on GPU, bfloat16 on CPUs with native BF16 (else float32);
+# int8 = bitsandbytes on CUDA; or bfloat16/float16/float32
+TTS_COMPUTE_TYPE: str = _get("TTS_COMPUTE_TYPE", "auto")
+TTS_SAMPLE_RATE: int = int(_get("TTS_SAMPLE_RATE", "24000"))
 
 # ── Audio ─────────────────────────────────────────────────
-CAPTURE_SAMPLE_RATE: int = int(os.getenv("CAPTURE_SAMPLE_RATE", "16000"))
-CAPTURE_CHUNK_MS: int = int(os.getenv("CAPTURE_CHUNK_MS", "100"))
+CAPTURE_SAMPLE_RATE: int = int(_get("CAPTURE_SAMPLE_RATE", "16000"))
+CAPTURE_CHUNK_MS: int = int(_get("CAPTURE_CHUNK_MS", "100"))
 
 # ── Commit Algorithm ─────────────────────────────────────
 # Increased window from 5.0s to 8.0s for better context on long sentences
-WINDOW_SEC: float = float(os.getenv("WINDOW_SEC", "8.0"))
-ASR_INTERVAL_MS: int = int(os.getenv("ASR_INTERVAL_MS", "500"))
-COMMIT_STABILITY_K: int = int(os.getenv("COMMIT_STABILITY_K", "3"))
-COMMIT_TIMEOUT_SEC: float = float(os.getenv("COMMIT_TIMEOUT_SEC", "2.0"))  # Reduced from 4.0 for faster commits
-COMMIT_MIN_WORDS: int = int(os.getenv("COMMIT_MIN_WORDS", "1"))  # Allow single words like "hola"
+WINDOW_SEC: float = float(_get("WINDOW_SEC", "8.0"))
+ASR_INTERVAL_MS: int = int(_get("ASR_INTERVAL_MS", "500"))
+COMMIT_STABILITY_K: int = int(_get("COMMIT_STABILITY_K", "3"))
+COMMIT_TIMEOUT_SEC: float = float(_get("COMMIT_TIMEOUT_SEC", "2.0"))  # Reduced from 4.0 for faster commits
+COMMIT_MIN_WORDS: int = int(_get("COMMIT_MIN_WORDS", "1"))  # Allow single words like "hola"
 
 # ── Backpressure ──────────────────────────────────────────
-TTS_QUEUE_MAX: int = int(os.getenv("TTS_QUEUE_MAX", "5"))
+TTS_QUEUE_MAX: int = int(_get("TTS_QUEUE_MAX", "5"))
+
+# ── Inference threads ─────────────────────────────────────
+# Outer Python workers shared by ASR/MT/TTS; each gets an equal share of the
+# cores for its inner (OpenMP/MKL/CTranslate2) threadpool so the two levels
+# don't oversubscribe the CPU.
+INFERENCE_WORKERS: int = max(1, int(_get("INFERENCE_WORKERS", "2")))
+INFERENCE_THREADS: int = max(1, (os.cpu_count() or 1) // INFERENCE_WORKERS)
+# Must be set before torch/ctranslate2 are imported; explicit env wins.
+os.environ.setdefault("OMP_NUM_THREADS", str(INFERENCE_THREADS))
+os.environ.setdefault("MKL_NUM_THREADS", str(INFERENCE_THREADS))
 
 # ── Server ────────────────────────────────────────────────
-HOST: str = os.getenv("HOST", "0.0.0.0")
-PORT: int = int(os.getenv("PORT", "8000"))
-LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+HOST: str = _get("HOST", "0.0.0.0")
+PORT: int = int(_get("PORT", "8000"))
+LOG_LEVEL: str = _get("LOG_LEVEL", "INFO")
 
 # ── Model Cache ──────────────────────────────────────────
-MODEL_CACHE_DIR: str = os.getenv("MODEL_CACHE_DIR", str(_root / "models"))
+MODEL_CACHE_DIR: str = _get("MODEL_CACHE_DIR", str(_root / "models"))
 Path(MODEL_CACHE_DIR).mkdir(parents=True, exist_ok=True)
 
 
+@lru_cache(maxsize=8)
 def resolve_device(requested: str | None = None) -> str:
-    """Return the best available device, with auto-fallback."""
+    """Return the best available device, with auto-fallback.
+
+    Cached per `requested` value: importing torch and probing the driver
+    only happens on the first call.
+    """
     dev = requested or DEVICE
     if dev == "mps":
         try:
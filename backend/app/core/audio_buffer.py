@@ -1,62 +1,198 @@
 """
 Circular audio buffer that maintains the last N seconds of PCM audio.
 Used by the ASR engine for sliding-window transcription.
+
+Single-producer / single-consumer: the WebSocket receiver appends and the
+ASR loop reads.  No lock is taken; writes are bracketed seqlock-style.
+Before touching any sample the producer reserves the end position it is
+about to write, and only after the samples are in place does it publish
+that position as the new write position.  A reader snapshots the published
+position (so it only sees fully written data), copies, then checks the
+reservation: if a write that started before or during the copy could have
+reached the region it copied, it retries.
+
+Writes near the start of the ring are mirrored into a ghost tail past its
+end, so reading the ASR window never needs a wraparound concatenation.
+
+Samples are stored as int16, the wire format of the incoming audio: PCM16
+chunks are appended without conversion, the ring is half the size of a
+float32 one, and only the window actually read is converted to float32.
+
+The ring and the read buffers start on 64-byte (cache line) boundaries so
+the copy and conversion loops run on aligned vector loads/stores.
 """
 
 import numpy as np
-import threading
 from typing import Optional
 
+from ..pipeline.pcm import f32_to_pcm16
+
+_PCM16_SCALE = np.float32(1.0 / 32768.0)
+
+_ALIGN_BYTES = 64
+
+
+def _aligned_empty(n: int, dtype) -> np.ndarray:
+    """Uninitialized 1-D array of `n` items whose data starts on a 64-byte boundary."""
+    itemsize = np.dtype(dtype).itemsize
+    raw = np.empty(n * itemsize + _ALIGN_BYTES, dtype=np.uint8)
+    offset = -raw.ctypes.data % _ALIGN_BYTES
+    return raw[offset : offset + n * itemsize].view(dtype)
+
 
 class AudioBuffer:
-    """Thread-safe circular buffer for PCM float32 audio at a fixed sample rate."""
+    """
+    Lock-free SPSC circular buffer for PCM16 audio at a fixed sample rate.
+
+    The ring is followed by a "ghost" tail that mirrors its first
+    `window_sec` seconds, so any read of up to `window_sec` seconds is a
+    single contiguous slice even when it straddles the wrap point.
 
-    def __init__(self, max_duration_sec: float = 10.0, sample_rate: int = 16000):
+    The physical ring is rounded up to a power of two so positions map to
+    ring offsets with a bit mask; reads are still capped at `max_samples`.
+    """
+
+    def __init__(
+        self,
+        max_duration_sec: float = 10.0,
+        sample_rate: int = 16000,
+        window_sec: Optional[float] = None,
+    ):
         self.sample_rate = sample_rate
         self.max_samples = int(max_duration_sec * sample_rate)
-        self._buf = np.zeros(self.max_samples, dtype=np.float32)
-        self._write_pos = 0  # how many samples written total (monotonic)
-        self._lock = threading.Lock()
+        ghost_sec = max_duration_sec if window_sec is None else min(window_sec, max_duration_sec)
+        self._ghost = int(ghost_sec * sample_rate)
+        self._size = 1 << max(self.max_samples - 1, 0).bit_length()
+        self._mask = self._size - 1
+        self._buf = _aligned_empty(self._size + self._ghost, np.int16)
+        self._buf.fill(0)
+        # Reused by append so the float32 → int16 conversion does not
+        # allocate per chunk.  Producer-only.
+        self._scratch_f32 = np.empty(self.max_samples, dtype=np.float32)
+        self._scratch_i16 = np.empty(self.max_samples, dtype=np.int16)
+        # int16 staging for float reads and the output of get_last.
+        # Consumer-only; overwritten on every read.
+        self._read_i16 = _aligned_empty(self.max_samples, np.int16)
+        self._read_scratch = _aligned_empty(self.max_samples, np.float32)
+        # How many samples written total (monotonic).  Only the producer
+        # assigns it; a plain int rebind is atomic for readers.
+        self._write_pos = 0
+        # End position of the write in progress (== _write_pos when idle).
+        # Raised before any sample is written, so readers see every write
+        # that may overlap what they copied.
+        self._reserved_pos = 0
 
     # ── write ─────────────────────────────────────────────
     def append(self, pcm_float32: np.ndarray) -> None:
-        """Append float32 samples. Automatically wraps when buffer is full."""
-        with self._lock:
-            n = len(pcm_float32)
-            if n >= self.max_samples:
-                # chunk bigger than buffer → keep only last max_samples
-                self._buf[:] = pcm_float32[-self.max_samples:]
-                self._write_pos += n
-                return
-            start = self._write_pos % self.max_samples
-            end = start + n
-            if end <= self.max_samples:
-                self._buf[start:end] = pcm_float32
-            else:
-                first = self.max_samples - start
-                self._buf[start:] = pcm_float32[:first]
-                self._buf[: n - first] = pcm_float32[first:]
-            self._write_pos += n
+        """Append float32 samples in [-1, 1] (quantized to PCM16 by f32_to_pcm16)."""
+        n = len(pcm_float32)
+        if n <= self.max_samples:
+            f32 = self._scratch_f32[:n]
+            out = self._scratch_i16[:n]
+        else:
+            f32 = np.empty(n, dtype=np.float32)
+            out = np.empty(n, dtype=np.int16)
+        f32[:] = pcm_float32
+        f32_to_pcm16(f32, out, overwrite_x=True)
+        self._append_i16(out)
 
     def append_pcm16(self, pcm16_bytes: bytes) -> None:
-        """Convenience: convert PCM16 bytes → float32 and append."""
-        pcm16 = np.frombuffer(pcm16_bytes, dtype=np.int16)
-        self.append(pcm16.astype(np.float32) / 32768.0)
+        """Append raw PCM16 bytes (stored as-is, no conversion)."""
+        self._append_i16(np.frombuffer(pcm16_bytes, dtype=np.int16))
+
+    def _append_i16(self, pcm16: np.ndarray) -> None:
+        """Append int16 samples. Automatically wraps when buffer is full."""
+        n = len(pcm16)
+        head = self._write_pos
+        size = self._size
+        self._reserved_pos = head + n
+        if n >= size:
+            # chunk bigger than buffer → keep only the last ring's worth, laid
+            # out so that the logical order matches the new write position
+            tail = pcm16[-size:]
+            split = (head + n) & self._mask
+            self._write_ring(split, tail[: size - split])
+            self._write_ring(0, tail[size - split:])
+            self._write_pos = head + n
+            return
+        start = head & self._mask
+        first = size - start
+        if n <= first:
+            self._write_ring(start, pcm16)
+        else:
+            self._write_ring(start, pcm16[:first])
+            self._write_ring(0, pcm16[first:])
+        # Publish only after the samples are in place
+        self._write_pos = head + n
+
+    def _write_ring(self, start: int, data: np.ndarray) -> None:
+        """Write `data` at ring offset `start` (no wrap) and mirror into the ghost tail."""
+        end = start + len(data)
+        np.copyto(self._buf[start:end], data)
+        if start < self._ghost:
+            g_end = min(end, self._ghost)
+            np.copyto(self._buf[self._size + start : self._size + g_end], data[: g_end - start])
 
     # ── read ──────────────────────────────────────────────
     def get_last(self, duration_sec: float) -> Optional[np.ndarray]:
-        """Return the last `duration_sec` seconds of audio as float32 array."""
-        with self._lock:
+        """
+        Return the last `duration_sec` seconds of audio as float32 array.
+
+        The result is a view into a buffer owned by this AudioBuffer and is
+        overwritten by the next call — consume it (or copy it) before then.
+        """
+        return self.get_last_into(duration_sec, self._read_scratch)
+
+    def get_last_into(self, duration_sec: float, out: np.ndarray) -> Optional[np.ndarray]:
+        """
+        Like get_last, but write into the caller-owned float32 array `out`.
+
+        Returns the filled prefix view of `out` (at most len(out) samples),
+        or None if nothing has been written yet.
+        """
+        n = min(len(out), self.max_samples)
+        pcm16 = self.get_last_pcm16_into(duration_sec, self._read_i16[:n])
+        if pcm16 is None:
+            return None
+        window = out[: len(pcm16)]
+        # One fused pass: NumPy casts int16 blocks to float32 inside the ufunc
+        # loop (no full-size temporary) and runs the vectorized f32 multiply.
+        np.multiply(pcm16, _PCM16_SCALE, out=window, dtype=np.float32, casting="unsafe")
+        return window
+
+    def get_last_pcm16_into(self, duration_sec: float, out: np.ndarray) -> Optional[np.ndarray]:
+        """
+        Copy the last `duration_sec` seconds as raw int16 into `out`.
+
+        Returns the filled prefix view of `out` (at most len(out) samples),
+        or None if nothing has been written yet.
+        """
+        while True:
             total_written = self._write_pos
             if total_written == 0:
                 return None
-            n_want = min(int(duration_sec * self.sample_rate), total_written, self.max_samples)
-            end = total_written % self.max_samples
+            n_want = min(
+                int(duration_sec * self.sample_rate), total_written, self.max_samples, len(out)
+            )
+            end = total_written & self._mask
             start = end - n_want
-            if start >= 0:
-                return self._buf[start:end].copy()
+            window = out[:n_want]
+            if n_want <= self._ghost:
+                # Shift reads that would wrap into the ghost tail
+                if end < n_want:
+                    end += self._size
+                np.copyto(window, self._buf[end - n_want : end])
+            elif start >= 0:
+                np.copyto(window, self._buf[start:end])
             else:
-                return np.concatenate([self._buf[start:], self._buf[:end]]).copy()
+                tail_len = -start
+                np.copyto(window[:tail_len], self._buf[start + self._size : self._size])
+                np.copyto(window[tail_len:], self._buf[:end])
+            # The producer may have overwritten part of what we copied; the
+            # copy is valid as long as no write, finished or in progress, has
+            # reached our oldest sample.
+            if self._reserved_pos - total_written <= self._size - n_want:
+                return window
 
     @property
     def total_samples_written(self) -> int:
@@ -67,6 +203,11 @@ class AudioBuffer:
         return min(self._write_pos, self.max_samples) / self.sample_rate
 
     def reset(self) -> None:
-        with self._lock:
-            self._buf[:] = 0
-            self._write_pos = 0
+        """
+        Clear the buffer.  Must be called from the producer side.
+
+        Only the write position is reset: reads are bounded by it, so the
+        stale samples left in the ring are never exposed and need no zeroing.
+        """
+        self._write_pos = 0
+        self._reserved_pos = 0
@@ -0,0 +1,28 @@
+"""
+Base64 helpers for PCM16 audio carried in JSON messages.
+
+Uses pybase64 (SIMD libbase64) when it is installed, else the stdlib
+module.  Decoding is strict: input with characters outside the base64
+alphabet raises binascii.Error instead of being silently skipped, which
+would shift the remaining bytes and turn the chunk into noise.
+
+b64encode takes any C-contiguous buffer, so PCM16 arrays can be passed as
+memoryview(arr) (or arr.data) without a tobytes() copy first.
+"""
+
+try:
+    import pybase64
+
+    # Returns str directly, skipping the bytes → str .decode() copy
+    b64encode = pybase64.b64encode_as_string
+
+    def b64decode(data: str | bytes) -> bytes:
+        return pybase64.b64decode(data, validate=True)
+except ImportError:
+    import base64
+
+    def b64encode(data: bytes | memoryview) -> str:
+        return base64.b64encode(data).decode("ascii")
+
+    def b64decode(data: str | bytes) -> bytes:
+        return base64.b64decode(data, validate=True)
@@ -5,13 +5,25 @@ Monitors the TTS output queue. When TTS falls behind:
   1. First, increase the commit batch size (merge multiple commits).
   2. If still behind, skip TTS for some commits (text-only).
   3. Never drop committed text — only degrade audio output.
+
+The pending counter and the degradation level are updated together under a small
+lock, so the controller stays correct when TTS completions are reported
+from worker threads (and on free-threaded CPython, where `+=` is not
+atomic).  Readers only load a single int and never take the lock.
 """
 
+import io
 import logging
+import threading
 import time
 
 logger = logging.getLogger(__name__)
 
+# Degradation levels (each level implies the ones below it)
+_LEVEL_NORMAL = 0
+_LEVEL_BATCH = 1  # merge commits before synthesizing
+_LEVEL_SKIP = 2  # also skip TTS for some commits
+
 
 class BackpressureController:
     """Adaptive backpressure for the TTS pipeline."""
@@ -19,59 +31,75 @@ class BackpressureController:
     def __init__(self, queue_max: int = 5):
         self.queue_max = queue_max
         self._pending_tts: int = 0
-        self._batch_mode: bool = False
-        self._skip_tts: bool = False
-        self._batch_buffer: list[str] = []
+        self._level: int = _LEVEL_NORMAL
+        # Batched text is streamed into one buffer (space-separated) so a
+        # long batch is not re-joined from a list on flush.
+        self._batch_buffer = io.StringIO()
+        self._batch_count: int = 0
+        self._lock = threading.Lock()
 
     def on_tts_queued(self) -> None:
-        self._pending_tts += 1
-        self._evaluate()
+        with self._lock:
+            self._pending_tts += 1
+            self._evaluate()
 
     def on_tts_completed(self) -> None:
-        self._pending_tts = max(0, self._pending_tts - 1)
-        self._evaluate()
+        with self._lock:
+            self._pending_tts = max(0, self._pending_tts - 1)
+            self._evaluate()
 
     def _evaluate(self) -> None:
-        if self._pending_tts > self.queue_max:
-            if not self._batch_mode:
+        # Check the highest threshold first so the skip level is reachable
+        if self._pending_tts > self.queue_max * 2:
+            level = _LEVEL_SKIP
+        elif self._pending_tts > self.queue_max:
+            level = _LEVEL_BATCH
+        else:
+            level = _LEVEL_NORMAL
+
+        if level > self._level:
+            if level == _LEVEL_SKIP:
+                logger.warning("TTS backpressure: skipping TTS for some commits")
+            elif level == _LEVEL_BATCH:
                 logger.warning(
                     f"TTS backpressure: queue={self._pending_tts}, "
                     f"switching to batch mode"
                 )
-            self._batch_mode = True
-        elif self._pending_tts > self.queue_max * 2:
-            if not self._skip_tts:
-                logger.warning("TTS backpressure: skipping TTS for some commits")
-            self._skip_tts = True
-        else:
-            self._batch_mode = False
-            self._skip_tts = False
+        self._level = level
 
     def should_skip_tts(self) -> bool:
         """If True, caller should not synthesize this commit."""
-        return self._skip_tts
+        return self._level >= _LEVEL_SKIP
 
     def should_batch(self) -> bool:
         """If True, caller should accumulate text and synthesize in larger chunks."""
-        return self._batch_mode
+        return self._level >= _LEVEL_BATCH
 
     def add_to_batch(self, text: str) -> None:
-        self._batch_buffer.append(text)
+        if self._batch_count:
+            self._batch_buffer.write(" ")
+        self._batch_buffer.write(text)
+        self._batch_count += 1
 
     def flush_batch(self) -> str | None:
         """Return accumulated batch text (if any) and clear buffer."""
-        if not self._batch_buffer:
+        if not self._batch_count:
             return None
-        merged = " ".join(self._batch_buffer)
-        self._batch_buffer.clear()
+        merged = self._batch_buffer.getvalue()
+        self._clear_batch()
         return merged
 
+    def _clear_batch(self) -> None:
+        self._batch_buffer.seek(0)
+        self._batch_buffer.truncate()
+        self._batch_count = 0
+
     @property
     def pending_count(self) -> int:
         return self._pending_tts
 
     def reset(self) -> None:
-        self._pending_tts = 0
-        self._batch_mode = False
-        self._skip_tts = False
-        self._batch_buffer.clear()
+        with self._lock:
+            self._pending_tts = 0
+            self._level = _LEVEL_NORMAL
+        self._clear_batch()
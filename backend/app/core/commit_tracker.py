@@ -14,20 +14,47 @@ Design:
     new hypotheses (the ASR sliding window re-covers committed audio).
 """
 
-import re
+import io
 import time
 import logging
+import numpy as np
+from collections import deque
 from dataclasses import dataclass, field
+from functools import lru_cache
+from itertools import islice
 
 logger = logging.getLogger(__name__)
 
-# Punctuation pattern for normalization
-_PUNCT_RE = re.compile(r'[.,;:!?\-–—¿¡"\'…()\[\]{}]+')
+# Punctuation stripped during normalization (single C-level pass via str.translate)
+_PUNCT_TABLE = str.maketrans('', '', '.,;:!?-–—¿¡"\'…()[]{}')
 
+# Limit lookback when stripping the committed prefix: the ASR window is
+# ~5s at ~3 words/s = ~15 words.  Use generous margin to cover fast speech.
+_MAX_LOOKBACK_WORDS = 40
 
+# Committed words kept for prefix stripping / context (older ones are only
+# kept in the append-only transcript)
+_COMMITTED_HISTORY_WORDS = 128
+
+# Token separator for joined word sequences.  str.split() treats it as
+# whitespace, so it can never occur inside a word.
+_SEP = "\x1f"
+
+# Initial capacity of the per-position stability arrays (grown on demand)
+_INITIAL_WORD_CAPACITY = 64
+
+# Distinct words the id map may hold before it is rebuilt from the current
+# uncommitted words (it is also rebuilt after every commit)
+_MAX_WORD_IDS = 1024
+
+
+@lru_cache(maxsize=4096)
 def _normalize(word: str) -> str:
-    """Lowercase + strip punctuation for fuzzy comparison."""
-    return _PUNCT_RE.sub('', word.lower())
+    """Lowercase + strip punctuation for fuzzy comparison.
+
+    Cached: the sliding window re-transcribes the same words on every tick.
+    """
+    return word.lower().translate(_PUNCT_TABLE)
 
 
 @dataclass
@@ -35,7 +62,7 @@ class CommitEvent:
     """Represents newly committed text."""
     text: str
     segment_id: int
-    timestamp: float
+    timestamp: float  # time.monotonic() at commit; compare only with that clock
 
 
 class CommitTracker:
@@ -65,12 +92,27 @@ class CommitTracker:
 
         # State
         self._prev_words: list[str] = []
-        self._stability_counts: list[int] = []  # per word-position
-        self._committed_words: list[str] = []
+        self._prev_norm: list[str] = []  # _normalize() of each prev word
+        # Per word-position state, preallocated and reused across updates.
+        # Only the first len(self._prev_norm) entries are meaningful.
+        self._stability_counts = np.zeros(_INITIAL_WORD_CAPACITY, dtype=np.int32)
+        self._prev_ids = np.zeros(_INITIAL_WORD_CAPACITY, dtype=np.int64)
+        # normalized word → integer id, for words since the last commit only
+        self._word_ids: dict[str, int] = {}
+        self._committed_words: deque[str] = deque(maxlen=_COMMITTED_HISTORY_WORDS)
+        self._committed_norm: deque[str] = deque(maxlen=_COMMITTED_HISTORY_WORDS)  # _normalize() of each
+        # Separator-joined lookback tail of _committed_norm, rebuilt only
+        # after a commit (it is searched on every update)
+        self._haystack: str | None = None
+        self._haystack_words = 0
+        self._transcript = io.StringIO()  # full committed text, append-only
         self._segment_id: int = 0
         self._last_commit_time: float = time.monotonic()
         self._last_hypothesis_time: float = time.monotonic()
         self._last_effective_words: list[str] = []  # exposed for partial transcript
+        # Raw hypothesis whose stripped form is _prev_words; None once a
+        # commit has changed what would be stripped from it.
+        self._last_raw_hypothesis: str | None = None
 
     # ── public API ────────────────────────────────────────
 
@@ -81,17 +123,28 @@ class CommitTracker:
         """
         now = time.monotonic()
         self._last_hypothesis_time = now
-        new_words = hypothesis.strip().split()
         events: list[CommitEvent] = []
 
-        # Remove already-committed prefix from hypothesis
-        effective_words = self._strip_committed_prefix(new_words)
+        if hypothesis == self._last_raw_hypothesis:
+            # Same text as last tick with no commit in between: the stripped
+            # words are unchanged and every position is stable one more time.
+            effective_words = self._prev_words
+            self._stability_counts[: len(effective_words)] += 1
+        else:
+            new_words = hypothesis.strip().split()
+            # Normalized once; shared by prefix stripping and stability
+            new_norm = [_normalize(w) for w in new_words]
+
+            # Remove already-committed prefix from hypothesis
+            n_strip = self._committed_prefix_len(new_words, new_norm)
+            effective_words = new_words[n_strip:]
+
+            # Compare with previous effective hypothesis word-by-word
+            self._update_stability(new_norm[n_strip:])
+            self._prev_words = effective_words
+            self._last_raw_hypothesis = hypothesis
         self._last_effective_words = effective_words
 
-        # Compare with previous effective hypothesis word-by-word
-        self._update_stability(effective_words)
-        self._prev_words = effective_words
-
         # Find the longest stable prefix
         stable_len = self._longest_stable_prefix()
 
@@ -100,7 +153,7 @@ class CommitTracker:
         should_commit = False
         commit_len = 0
 
-        if stable_len >= self.min_words and self._all_stable_k(stable_len):
+        if stable_len >= self.min_words:
             should_commit = True
             commit_len = stable_len
         elif time_since_commit >= self.timeout_sec and len(effective_words) >= self.min_words:
@@ -121,13 +174,16 @@ class CommitTracker:
             events.append(event)
 
             # Update committed state
-            self._committed_words.extend(words_to_commit)
+            self._record_commit(words_to_commit, self._prev_norm[:commit_len], committed_text)
             self._last_commit_time = now
 
             # Reset stability for the remaining (uncommitted) words
             self._prev_words = effective_words[commit_len:]
-            self._stability_counts = [0] * len(self._prev_words)
+            self._prev_norm = self._prev_norm[commit_len:]
+            self._reindex_prev()
+            self._stability_counts[: len(self._prev_norm)] = 0
             self._last_effective_words = self._prev_words[:]
+            self._last_raw_hypothesis = None
 
             logger.info(f"Committed [{self._segment_id}]: '{committed_text}'")
 
@@ -152,9 +208,10 @@ class CommitTracker:
             segment_id=self._segment_id,
             timestamp=time.monotonic(),
         )
-        self._committed_words.extend(self._prev_words)
+        self._record_commit(self._prev_words, self._prev_norm, text)
         self._prev_words = []
-        self._stability_counts = []
+        self._prev_norm = []
+        self._last_raw_hypothesis = None
         self._last_commit_time = time.monotonic()
         logger.info(f"Force-committed [{self._segment_id}]: '{text}'")
         return [event]
@@ -162,98 +219,124 @@ class CommitTracker:
     @property
     def context_tail(self) -> str:
         """Return the last few committed words as context for ASR."""
-        tail = self._committed_words[-5:]
-        return " ".join(tail)
+        words = self._committed_words
+        return " ".join(islice(words, max(len(words) - 5, 0), None))
 
     @property
     def all_committed_text(self) -> str:
-        return " ".join(self._committed_words)
+        return self._transcript.getvalue()
 
     def reset(self) -> None:
         self._prev_words = []
-        self._stability_counts = []
-        self._committed_words = []
+        self._prev_norm = []
+        self._word_ids.clear()
+        self._committed_words.clear()
+        self._committed_norm.clear()
+        self._haystack = None
+        self._transcript = io.StringIO()
         self._segment_id = 0
         self._last_commit_time = time.monotonic()
         self._last_effective_words = []
+        self._last_raw_hypothesis = None
 
     # ── internals ─────────────────────────────────────────
 
-    def _strip_committed_prefix(self, words: list[str]) -> list[str]:
+    def _record_commit(self, words: list[str], norm: list[str], text: str) -> None:
+        """Append committed words to the bounded history and the transcript."""
+        self._committed_words.extend(words)
+        self._committed_norm.extend(norm)
+        self._haystack = None
+        if self._transcript.tell():
+            self._transcript.write(" ")
+        self._transcript.write(text)
+
+    def _committed_prefix_len(self, words: list[str], words_norm: list[str]) -> int:
         """
-        Remove already-committed words from the beginning of the hypothesis.
+        Number of already-committed words at the beginning of the hypothesis.
 
         The ASR sliding window covers the last WINDOW_SEC seconds of audio.
         This audio may include content that was already committed. The ASR
         will re-transcribe it, so the hypothesis starts with already-committed
-        text. We find the longest overlap between any suffix of committed_words
-        and a prefix of the hypothesis, then strip it.
+        text. We find the longest prefix of the hypothesis that appears
+        contiguously in the recent committed words, so it can be stripped.
 
         Uses normalized comparison (lowercase, no punctuation) so minor
         differences like "como..." vs "como" still match.
         """
-        if not self._committed_words or not words:
-            return words
-
-        committed_norm = [_normalize(w) for w in self._committed_words]
-        words_norm = [_normalize(w) for w in words]
-
-        # Limit lookback: the ASR window is ~5s at ~3 words/s = ~15 words.
-        # Use generous margin of 40 words to cover fast speech.
-        max_lookback = min(len(committed_norm), 40)
-        search_committed = committed_norm[-max_lookback:]
-
-        best_strip = 0
-
-        # Try every starting position in the committed suffix.
-        # For each start, see how many words from search_committed[start:]
-        # match words_norm[0:] contiguously.
-        for start in range(len(search_committed)):
-            suffix = search_committed[start:]
-            match_len = 0
-            for j in range(min(len(suffix), len(words_norm))):
-                if suffix[j] == words_norm[j]:
-                    match_len = j + 1
-                else:
-                    break
-            if match_len > best_strip:
-                best_strip = match_len
-
-        # Also check if the ENTIRE hypothesis is a subset of committed text
-        # (happens when the user stops talking and ASR just repeats old text)
-        if best_strip == len(words_norm):
-            logger.debug("Entire hypothesis is already committed — discarding")
-            return []
-
-        if best_strip > 0:
-            logger.debug(f"Stripped {best_strip} committed words from hypothesis "
-                        f"({' '.join(words[:best_strip][:5])}...)")
-
-        return words[best_strip:]
-
-    def _update_stability(self, new_words: list[str]) -> None:
-        """Compare new_words with prev_words position by position."""
-        new_counts = []
-        for i, w in enumerate(new_words):
-            if i < len(self._prev_words) and _normalize(w) == _normalize(self._prev_words[i]):
-                prev_count = self._stability_counts[i] if i < len(self._stability_counts) else 0
-                new_counts.append(prev_count + 1)
+        if not self._committed_norm or not words_norm:
+            return 0
+
+        if self._haystack is None:
+            committed = self._committed_norm
+            tail = list(islice(committed, max(len(committed) - _MAX_LOOKBACK_WORDS, 0), None))
+            self._haystack = _SEP + _SEP.join(tail) + _SEP
+            self._haystack_words = len(tail)
+        haystack = self._haystack
+
+        # A hypothesis prefix that occurs in the committed tail implies every
+        # shorter prefix does too, so binary-search its length.  Each probe is
+        # a single C-level substring search over the separator-joined words.
+        lo, hi = 0, min(self._haystack_words, len(words_norm))
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if _SEP + _SEP.join(words_norm[:mid]) + _SEP in haystack:
+                lo = mid
             else:
-                new_counts.append(1)
-        self._stability_counts = new_counts
+                hi = mid - 1
+
+        # The ENTIRE hypothesis may already be committed text (happens when
+        # the user stops talking and ASR just repeats old text)
+        if lo == len(words_norm):
+            logger.debug("Entire hypothesis is already committed — discarding")
+        elif lo > 0 and logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Stripped %d committed words from hypothesis (%s...)",
+                         lo, " ".join(words[:min(lo, 5)]))
+
+        return lo
+
+    def _update_stability(self, new_norm: list[str]) -> None:
+        """Compare the normalized new words with prev words position by position."""
+        n = len(new_norm)
+        if n > len(self._stability_counts):
+            self._grow(n)
+
+        if len(self._word_ids) > _MAX_WORD_IDS:
+            self._reindex_prev()
+        ids = self._word_ids
+        new_ids = np.fromiter(
+            (ids.setdefault(w, len(ids)) for w in new_norm), dtype=np.int64, count=n
+        )
+        m = min(n, len(self._prev_norm))
+        counts = self._stability_counts
+        counts[:m] = np.where(new_ids[:m] == self._prev_ids[:m], counts[:m] + 1, 1)
+        counts[m:n] = 1
+        self._prev_ids[:n] = new_ids
+        self._prev_norm = new_norm
+
+    def _reindex_prev(self) -> None:
+        """Rebuild the word id map from the current uncommitted words only.
+
+        Ids only need to agree between consecutive hypotheses, so the map is
+        reset to keep its size bounded over a long session.
+        """
+        ids: dict[str, int] = {}
+        n = len(self._prev_norm)
+        self._prev_ids[:n] = [ids.setdefault(w, len(ids)) for w in self._prev_norm]
+        self._word_ids = ids
+
+    def _grow(self, n: int) -> None:
+        """Grow the per-position arrays geometrically to hold at least n words."""
+        capacity = max(n, 2 * len(self._stability_counts))
+        for name in ("_stability_counts", "_prev_ids"):
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[: len(old)] = old
+            setattr(self, name, new)
 
     def _longest_stable_prefix(self) -> int:
         """Length of the longest prefix where every word has count >= stability_k."""
-        length = 0
-        for count in self._stability_counts:
-            if count >= self.stability_k:
-                length += 1
-            else:
-                break
-        return length
-
-    def _all_stable_k(self, up_to: int) -> bool:
-        for i in range(up_to):
-            if i >= len(self._stability_counts) or self._stability_counts[i] < self.stability_k:
-                return False
-        return True
+        n = len(self._prev_norm)
+        stable = self._stability_counts[:n] >= self.stability_k
+        if stable.all():
+            return n
+        return int(np.argmin(stable))
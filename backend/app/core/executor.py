@@ -0,0 +1,39 @@
+"""
+Shared thread pool for blocking model inference (ASR, MT, TTS).
+
+The engines run their synchronous model calls here instead of the event
+loop's default executor (min(32, cpu_count + 4) threads).  The models
+already parallelize internally, so a small, fixed number of outer workers
+keeps the inner threadpools from fighting over the cores.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from ..config import INFERENCE_WORKERS
+
+_executor: Optional[ThreadPoolExecutor] = None
+_lock = threading.Lock()
+
+
+def get_inference_executor() -> ThreadPoolExecutor:
+    """Return the process-wide inference executor, creating it on first use."""
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=INFERENCE_WORKERS,
+                    thread_name_prefix="inference",
+                )
+    return _executor
+
+
+def shutdown_inference_executor() -> None:
+    """Shut the executor down (at app shutdown); a later call recreates it."""
+    global _executor
+    with _lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -6,17 +6,26 @@ Endpoints:
   WS   /ws/stream        → streaming translation WebSocket
 """
 
+from __future__ import annotations
+
+import asyncio
+import json
 import logging
 from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING
 
-from fastapi import FastAPI, WebSocket
+from fastapi import FastAPI, Response, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
 
-from .config import HOST, PORT, LOG_LEVEL, resolve_device, ASR_MODEL, ASR_MAX_NEW_TOKENS, ASR_MAX_BATCH_SIZE, TTS_ENGINE, TTS_QWEN3_MODEL, TTS_SAMPLE_RATE
-from .pipeline.asr import ASREngine
-from .pipeline.mt import MTEngine
-from .pipeline.tts import TTSEngine
-from .ws.handler import StreamSession
+from .core.executor import shutdown_inference_executor
+from .config import HOST, PORT, LOG_LEVEL, resolve_device, ASR_MODEL, ASR_MAX_NEW_TOKENS, ASR_MAX_BATCH_SIZE, ASR_COMPUTE_TYPE, MT_BACKEND, MT_BEAM_SIZE, MT_COMPUTE_TYPE, MT_MAX_BATCH_SIZE, MODEL_CACHE_DIR, TTS_ENGINE, TTS_QWEN3_MODEL, TTS_COMPUTE_TYPE, TTS_SAMPLE_RATE
+
+# Pipeline modules are imported inside lifespan()/ws_stream() so importing
+# the app (e.g. by a uvicorn worker) does not pay for them up front.
+if TYPE_CHECKING:
+    from .pipeline.asr import ASREngine
+    from .pipeline.mt import MTEngine
+    from .pipeline.tts import TTSEngine
 
 # ── Logging ───────────────────────────────────────────────
 logging.basicConfig(
@@ -31,11 +40,20 @@ asr_engine: ASREngine | None = None
 mt_engine: MTEngine | None = None
 tts_engine: TTSEngine | None = None
 
+# /health body, serialized once.  uvicorn only serves requests after
+# lifespan() startup has returned, i.e. after every engine has loaded.
+_HEALTH_READY = json.dumps(
+    {"status": "ok", "asr": True, "mt": True, "tts": True}
+).encode()
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Load models on startup, clean up on shutdown."""
     global asr_engine, mt_engine, tts_engine
+    from .pipeline.asr import ASREngine
+    from .pipeline.mt import MTEngine
+    from .pipeline.tts import TTSEngine
 
     device = resolve_device()
     logger.info(f"Device: {device}")
@@ -46,25 +64,44 @@ async def lifespan(app: FastAPI):
         device=device,
         max_new_tokens=ASR_MAX_NEW_TOKENS,
         max_inference_batch_size=ASR_MAX_BATCH_SIZE,
+        compute_type=ASR_COMPUTE_TYPE,
     )
-    asr_engine.load()
 
     # MT (lazy-loaded per pair, but we pre-load es-en)
-    mt_engine = MTEngine(device=device)
-    mt_engine.load_pair("es", "en")
-    mt_engine.load_pair("en", "es")
+    mt_engine = MTEngine(
+        device=device,
+        backend=MT_BACKEND,
+        cache_dir=MODEL_CACHE_DIR,
+        beam_size=MT_BEAM_SIZE,
+        compute_type=MT_COMPUTE_TYPE,
+        max_batch_size=MT_MAX_BATCH_SIZE,
+    )
 
     # TTS
     tts_engine = TTSEngine(
         backend=TTS_ENGINE,
         qwen3_model=TTS_QWEN3_MODEL,
+        compute_type=TTS_COMPUTE_TYPE,
         device=device,
         output_sample_rate=TTS_SAMPLE_RATE,
     )
-    tts_engine.load()
+
+    # The loads are independent and mostly disk reads and native code that
+    # releases the GIL, so they run in parallel threads: startup takes about
+    # as long as the slowest model instead of the sum.
+    def load_mt() -> None:
+        mt_engine.load_pair("es", "en")
+        mt_engine.load_pair("en", "es")
+
+    await asyncio.gather(
+        asyncio.to_thread(asr_engine.load),
+        asyncio.to_thread(load_mt),
+        asyncio.to_thread(tts_engine.load),
+    )
 
     logger.info("All models loaded ✓")
     yield
+    shutdown_inference_executor()
     logger.info("Shutting down")
 
 
@@ -88,16 +125,13 @@ app.add_middleware(
 
 @app.get("/health")
 async def health():
-    return {
-        "status": "ok",
-        "asr": asr_engine is not None and asr_engine._loaded,
-        "mt": mt_engine is not None,
-        "tts": tts_engine is not None and tts_engine._loaded,
-    }
+    return Response(content=_HEALTH_READY, media_type="application/json")
 
 
 @app.websocket("/ws/stream")
 async def ws_stream(websocket: WebSocket):
+    from .ws.handler import StreamSession
+
     session = StreamSession(
         ws=websocket,
         asr_engine=asr_engine,
@@ -111,12 +145,22 @@ async def ws_stream(websocket: WebSocket):
 
 def main():
     import uvicorn
+
+    # uvloop (installed with uvicorn[standard]) cuts per-frame syscall
+    # overhead on the WS path; the loop is created by uvicorn, so it has to
+    # be selected here rather than installed from inside the app.
+    try:
+        import uvloop  # noqa: F401
+        loop = "uvloop"
+    except ImportError:
+        loop = "auto"
     uvicorn.run(
         "app.main:app",
         host=HOST,
         port=PORT,
         reload=False,
         log_level=LOG_LEVEL.lower(),
+        loop=loop,
     )
 
 
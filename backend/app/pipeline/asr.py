@@ -18,10 +18,14 @@ The CommitTracker (external) decides what to commit.
 import asyncio
 import logging
 import re
+import threading
 import numpy as np
 from collections import Counter
+from functools import lru_cache
 from typing import Optional
 
+from ..core.executor import get_inference_executor
+
 logger = logging.getLogger(__name__)
 
 # ── Hallucination heuristics ────────────────────────────
@@ -30,14 +34,90 @@ logger = logging.getLogger(__name__)
 _MIN_RMS_ENERGY = 0.008  # ~-42 dB
 
 # Repeated/hallucinated pattern detection
+_HALLUCINATION_EXPRESSIONS: tuple[str, ...] = (
+    r'subtitle', r'subscribe', r'suscr[ií]bete', r'suscr[ií]banse', r'gracias por ver',
+    r'thank you for watching',
+    r'music', r'applause', r'm[uú]sica', r'aplausos',
+    r'Amara\.org', r'MoroccoEnglish', r'Madriman',
+    r'\bwww\.\w+\.\w+\b',
+)
 _HALLUCINATION_PATTERNS = re.compile(
-    r'(subtitle|subscribe|suscr[ií]bete|suscr[ií]banse|gracias por ver|thank you for watching'
-    r'|music|applause|m[uú]sica|aplausos'
-    r'|Amara\.org|MoroccoEnglish|Madriman'
-    r'|\bwww\.\w+\.\w+\b)',
+    "(" + "|".join(_HALLUCINATION_EXPRESSIONS) + ")",
     re.IGNORECASE,
 )
 
+# Literal substrings (casefolded) that every _HALLUCINATION_PATTERNS match
+# contains.  If none occurs, the regex cannot match and is skipped.
+_HALLUCINATION_ANCHORS: tuple[str, ...] = (
+    "subtitle", "subscribe", "suscr", "gracias por ver", "thank you for watching",
+    "music", "applause", "sica", "aplausos",
+    "amara.org", "moroccoenglish", "madriman", "www.",
+)
+
+
+# Hyperscan has no Unicode \b, so the URL expression is scanned as a literal
+# "www." and hits on it are confirmed with the regex.
+_HS_EXPRESSIONS: tuple[str, ...] = _HALLUCINATION_EXPRESSIONS[:-1] + (r'www\.',)
+_HS_CONFIRM_ID = len(_HS_EXPRESSIONS) - 1
+
+
+def _compile_hyperscan():
+    """Compile the hallucination expressions into a Hyperscan database, if available.
+
+    Hyperscan matches all expressions in one linear-time pass.  Optional:
+    returns None (and the anchor + regex path is used) when the package is
+    not installed or the platform is unsupported.
+    """
+    try:
+        import hyperscan
+    except ImportError:
+        return None
+    try:
+        flags = hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_UTF8 | hyperscan.HS_FLAG_SINGLEMATCH
+        db = hyperscan.Database()
+        db.compile(
+            expressions=[e.encode() for e in _HS_EXPRESSIONS],
+            ids=list(range(len(_HS_EXPRESSIONS))),
+            elements=len(_HS_EXPRESSIONS),
+            flags=[flags] * len(_HS_EXPRESSIONS),
+        )
+        return db
+    except Exception as e:
+        logger.warning(f"Hyperscan unavailable, using regex hallucination filter: {e}")
+        return None
+
+
+_HYPERSCAN_DB = _compile_hyperscan()
+# Hyperscan scratch space must not be shared between concurrent scans
+_hs_local = threading.local()
+
+
+def _on_hs_match(expr_id: int, _start: int, _end: int, _flags: int, hits: list) -> bool:
+    hits.append(expr_id)
+    # A truthy return stops the scan: any hit but the URL one is final
+    return expr_id != _HS_CONFIRM_ID
+
+
+def _has_hallucination_pattern(text: str, folded: str) -> bool:
+    """True if `text` (with casefolded form `folded`) contains a hallucination phrase."""
+    if _HYPERSCAN_DB is None:
+        return any(a in folded for a in _HALLUCINATION_ANCHORS) and bool(
+            _HALLUCINATION_PATTERNS.search(text)
+        )
+    import hyperscan
+
+    scratch = getattr(_hs_local, "scratch", None)
+    if scratch is None:
+        scratch = _hs_local.scratch = hyperscan.Scratch(_HYPERSCAN_DB)
+    hits: list[int] = []
+    try:
+        _HYPERSCAN_DB.scan(
+            folded.encode(), match_event_handler=_on_hs_match, context=hits, scratch=scratch
+        )
+    except hyperscan.ScanTerminated:
+        return True
+    return bool(hits) and bool(_HALLUCINATION_PATTERNS.search(text))
+
 # Qwen3-ASR expects language names (e.g. "Spanish", "English"). Map from our codes.
 _LANG_CODE_TO_QWEN: dict[str, Optional[str]] = {
     "es": "Spanish",
@@ -74,41 +154,50 @@ _LANG_CODE_TO_QWEN: dict[str, Optional[str]] = {
 
 
 def _compute_rms(audio: np.ndarray) -> float:
-    """Compute Root Mean Square of audio signal."""
-    return float(np.sqrt(np.mean(audio ** 2)))
+    """Compute Root Mean Square of audio signal.
+
+    np.dot fuses square+sum in one SIMD pass without an `audio ** 2` temporary.
+    """
+    return float(np.sqrt(np.dot(audio, audio) / audio.size))
 
 
 def _is_repetitive(text: str, threshold: float = 0.5) -> bool:
-    """Check if the text is mostly repeated tokens (hallucination pattern)."""
+    """Check if the text is mostly repeated tokens (hallucination pattern).
+
+    A single Counter pass gives both the distinct-word count and the top
+    count; no separate set or most_common sort.
+    """
     words = text.lower().split()
-    if len(words) < 4:
+    n = len(words)
+    if n < 4:
         return False
-    unique = set(words)
-    if len(unique) <= 2 and len(words) >= 6:
-        return True
     counts = Counter(words)
-    most_common_count = counts.most_common(1)[0][1]
-    if most_common_count / len(words) > threshold:
+    if len(counts) <= 2 and n >= 6:
         return True
-    return False
+    return max(counts.values()) / n > threshold
 
 
 def _apply_post_filters(text: str) -> str:
     """Apply hallucination filters to raw ASR output. Returns empty string if rejected."""
-    if not text or not text.strip():
+    t = text.strip() if text else ""
+    if not t:
         return ""
-    t = text.strip()
-    if _HALLUCINATION_PATTERNS.search(t):
-        logger.debug(f"Dropping hallucination pattern: '{t[:50]}'")
+    # %-style args: the slice/format only happens if DEBUG is enabled
+    if _has_hallucination_pattern(t, t.casefold()):
+        logger.debug("Dropping hallucination pattern: '%.50s'", t)
         return ""
     if _is_repetitive(t):
-        logger.debug(f"Dropping repetitive hypothesis: '{t[:80]}'")
+        logger.debug("Dropping repetitive hypothesis: '%.80s'", t)
         return ""
     return t
 
 
+@lru_cache(maxsize=64)
 def _language_for_qwen(code: str) -> Optional[str]:
-    """Map client language code (e.g. 'es') to Qwen3-ASR language name, or None for auto."""
+    """Map client language code (e.g. 'es') to Qwen3-ASR language name, or None for auto.
+
+    Cached: a session passes the same code on every ASR tick.
+    """
     if not code:
         return None
     return _LANG_CODE_TO_QWEN.get(code.strip().lower(), None)
@@ -126,12 +215,17 @@ class ASREngine:
         device: str = "cpu",
         max_new_tokens: int = 256,
         max_inference_batch_size: int = 32,
+        compute_type: str = "auto",
     ):
         self.model_name = model_name
         self.device = device
         self.max_new_tokens = max_new_tokens
         self.max_inference_batch_size = max_inference_batch_size
+        # "auto" (bfloat16 on CUDA, int8 dynamic quantization on CPU),
+        # "int8", "float32", "bfloat16" or "float16"
+        self.compute_type = compute_type
         self._model = None
+        self._torch = None  # torch module, imported in load()
         self._loaded = False
 
     def load(self) -> None:
@@ -142,12 +236,16 @@ class ASREngine:
             import torch
             from qwen_asr import Qwen3ASRModel
 
+            self._torch = torch
             dtype = torch.bfloat16 if self.device == "cuda" else torch.float32
             device_map = "cuda:0" if self.device == "cuda" else "cpu"
             if self.device == "mps":
                 device_map = "cpu"
                 dtype = torch.float32
                 logger.info("Qwen3-ASR: MPS not officially supported, using CPU")
+            if self.compute_type in ("float32", "bfloat16", "float16"):
+                dtype = getattr(torch, self.compute_type)
+            quantize_int8 = device_map == "cpu" and self.compute_type in ("auto", "int8")
 
             self._model = Qwen3ASRModel.from_pretrained(
                 self.model_name,
@@ -156,6 +254,10 @@ class ASREngine:
                 max_inference_batch_size=self.max_inference_batch_size,
                 max_new_tokens=self.max_new_tokens,
             )
+            if quantize_int8 and self._quantize_int8():
+                dtype = "int8 dynamic"
+            elif device_map.startswith("cuda"):
+                self._compile_forward()
             self._loaded = True
             logger.info(
                 f"ASR loaded: Qwen3-ASR {self.model_name} on {device_map} ({dtype})"
@@ -166,42 +268,96 @@ class ASREngine:
             )
             raise ImportError("qwen-asr is required for ASR. pip install qwen-asr") from e
 
+    def _quantize_int8(self) -> bool:
+        """Apply int8 dynamic quantization to the Linear layers (CPU only).
+
+        Returns False (model stays float32) if the underlying torch module
+        cannot be found or quantization fails.
+        """
+        torch = self._torch
+        target = self._model
+        if not isinstance(target, torch.nn.Module):
+            target = getattr(target, "model", None)
+        if not isinstance(target, torch.nn.Module):
+            logger.info("Qwen3-ASR: no torch module exposed, skipping int8 quantization")
+            return False
+        try:
+            torch.ao.quantization.quantize_dynamic(
+                target, {torch.nn.Linear}, dtype=torch.qint8, inplace=True
+            )
+            return True
+        except Exception as e:
+            logger.warning(f"Qwen3-ASR int8 quantization failed, using float32: {e}")
+            return False
+
+    def _compile_forward(self) -> None:
+        """Wrap the underlying module's forward with torch.compile (CUDA only).
+
+        Same approach as the MT engine: only forward is compiled, so the
+        wrapper's generate loop is unchanged, and dynamic shapes avoid a
+        recompile per decoded length.  torch.compile is lazy, so a short
+        silent window is transcribed here to trigger the actual compilation;
+        if it fails the eager forward is restored.
+        """
+        torch = self._torch
+        target = self._model
+        if not isinstance(target, torch.nn.Module):
+            target = getattr(target, "model", None)
+        if not isinstance(target, torch.nn.Module):
+            return
+        eager_forward = target.forward
+        try:
+            target.forward = torch.compile(eager_forward, dynamic=True)
+            with torch.inference_mode():
+                self._model.transcribe(audio=(np.zeros(16000, dtype=np.float32), 16000))
+        except Exception as e:
+            target.forward = eager_forward
+            logger.info(f"torch.compile unavailable for ASR, running eager: {e}")
+
     async def transcribe(
         self,
         audio: np.ndarray,
         language: str = "es",
+        rms: Optional[float] = None,
     ) -> str:
         """
         Transcribe audio (float32, 16kHz) and return the text.
         Runs in a thread pool to avoid blocking the event loop.
         Returns empty string if audio is too quiet or no speech detected.
+
+        Pass `rms` if the caller already computed it for this window to
+        skip a second pass over the audio.
         """
         if not self._loaded or self._model is None:
             return ""
         if audio is None or len(audio) < 8000:  # < 0.5s
             return ""
 
-        rms = _compute_rms(audio)
+        if rms is None:
+            rms = _compute_rms(audio)
         if rms < _MIN_RMS_ENERGY:
-            logger.debug(f"Audio too quiet (RMS={rms:.5f}), skipping ASR")
+            logger.debug("Audio too quiet (RMS=%.5f), skipping ASR", rms)
             return ""
 
         loop = asyncio.get_running_loop()
         return await loop.run_in_executor(
-            None, self._transcribe_sync, audio, language
+            get_inference_executor(), self._transcribe_sync, audio, language
         )
 
     def _transcribe_sync(self, audio: np.ndarray, language: str) -> str:
         """Synchronous transcription (called from thread pool)."""
         try:
-            # Qwen3-ASR accepts (np.ndarray, sample_rate) or path/URL/base64
-            audio_input = (audio.astype(np.float32), 16000)
+            # Qwen3-ASR accepts (np.ndarray, sample_rate) or path/URL/base64.
+            # No copy when the window is already contiguous float32 (AudioBuffer).
+            audio_input = (np.ascontiguousarray(audio, dtype=np.float32), 16000)
             lang = _language_for_qwen(language)  # "Spanish" or None for auto
 
-            results = self._model.transcribe(
-                audio=audio_input,
-                language=lang,
-            )
+            # No autograd bookkeeping (version counters, grad tracking)
+            with self._torch.inference_mode():
+                results = self._model.transcribe(
+                    audio=audio_input,
+                    language=lang,
+                )
             if not results:
                 return ""
 
@@ -210,7 +366,7 @@ class ASREngine:
                 return ""
 
             # Strip optional "lang XXX: " prefix if present (e.g. "lang English: Hi there")
-            if raw.lower().startswith("lang "):
+            if raw[:5].lower() == "lang ":
                 idx = raw.find(":", 5)
                 if idx != -1:
                     raw = raw[idx + 1 :].strip()
@@ -219,3 +375,28 @@ class ASREngine:
         except Exception as e:
             logger.error(f"ASR transcription error: {e}", exc_info=True)
             return ""
+
+
+@lru_cache(maxsize=8)
+def get_asr_engine(
+    model_name: str,
+    device: str = "cpu",
+    max_new_tokens: int = 256,
+    max_inference_batch_size: int = 32,
+    compute_type: str = "auto",
+) -> ASREngine:
+    """
+    Return a loaded ASREngine, shared by calls with the same arguments.
+
+    For scripts that run the pipeline several times in one process; the
+    server builds its engines once at startup.
+    """
+    engine = ASREngine(
+        model_name=model_name,
+        device=device,
+        max_new_tokens=max_new_tokens,
+        max_inference_batch_size=max_inference_batch_size,
+        compute_type=compute_type,
+    )
+    engine.load()
+    return engine
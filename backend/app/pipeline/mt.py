@@ -4,12 +4,45 @@ MT Engine — Machine Translation using MarianMT (Helsinki-NLP).
 Translates committed text segments.  Models are loaded lazily and cached
 per language pair so we only load what's needed.
 
+Supports two backends:
+  1. ctranslate2 (default): the MarianMT checkpoint converted once to an
+     int8 CTranslate2 model under the cache dir; much faster on CPU.
+  2. transformers: MarianMTModel.generate via PyTorch; on CUDA the model
+     runs in FP16 with a torch.compile'd forward (compute_type="auto").
+A pair whose CTranslate2 conversion or load fails falls back to transformers.
+
+Both use the MarianTokenizer for encode/decode.
+
+Concurrent translate() calls for the same pair (several sessions, or
+commits arriving while a translation is running) are coalesced by a
+per-pair worker task into a single batched model call.
+
+Finished translations are kept in an LRU keyed on the exact source
+(decoding is deterministic), so a segment that is committed again —
+"okay", a name, a repeated phrase — skips the model entirely.  A request
+for a source that is already being translated waits on that translation
+instead of queueing a duplicate.
+
+Source text is tokenized through a per-pair LRU cache.  A caller that
+prepends earlier (backpressure-batched) text passes it as `prefix`; the
+prefix and the new segment are encoded separately and their ids joined,
+which matches encoding the space-joined string since SentencePiece
+pieces never cross whitespace.
+
 Supported MVP pairs: es→en, en→es.
 """
 
 import asyncio
 import logging
-from typing import Optional
+import shutil
+import tempfile
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Optional
+
+from ..config import INFERENCE_THREADS
+from ..core.executor import get_inference_executor
 
 logger = logging.getLogger(__name__)
 
@@ -19,33 +52,158 @@ DEFAULT_MODELS: dict[str, str] = {
     "en-es": "Helsinki-NLP/opus-mt-en-es",
 }
 
+# Source truncation length in tokens (commits are typically < 40 tokens)
+_MAX_INPUT_TOKENS = 256
+
+# Distinct source strings whose token ids are cached per pair
+_ENCODE_CACHE_SIZE = 1024
+
+# Finished translations kept across all pairs, keyed on (pair, prefix, text)
+_TRANSLATION_CACHE_SIZE = 1024
+
+
+def _make_encoder(tokenizer) -> Callable[[str], tuple[int, ...]]:
+    """Return a cached text → token ids function (no special tokens)."""
+    @lru_cache(maxsize=_ENCODE_CACHE_SIZE)
+    def encode(text: str) -> tuple[int, ...]:
+        return tuple(tokenizer.encode(text, add_special_tokens=False))
+    return encode
+
+
+def _join(prefix: str, text: str) -> str:
+    return f"{prefix} {text}" if prefix else text
+
 
 class MTEngine:
     """MarianMT-based translation engine with lazy model loading."""
 
-    def __init__(self, model_map: dict[str, str] | None = None, device: str = "cpu"):
+    def __init__(
+        self,
+        model_map: dict[str, str] | None = None,
+        device: str = "cpu",
+        backend: str = "ctranslate2",
+        cache_dir: str = "models",
+        beam_size: int = 1,
+        compute_type: str = "auto",
+        max_batch_size: int = 16,
+    ):
+        if backend not in ("ctranslate2", "transformers"):
+            raise ValueError(f"Unknown MT backend: {backend}")
         self.device = device
+        self.backend = backend
+        self.cache_dir = cache_dir
+        # "auto" (CTranslate2's pick; FP16 for transformers on CUDA),
+        # "float16" or "float32"; CTranslate2 also takes its own types
+        # such as "int8_float16"
+        self.compute_type = compute_type
+        # 1 = greedy decoding: short streaming segments gain little from beams
+        self.beam_size = beam_size
+        # Upper bound on segments translated in one batched model call
+        self.max_batch_size = max_batch_size
         self.model_map = model_map or DEFAULT_MODELS
-        self._models: dict[str, tuple] = {}  # pair → (tokenizer, model)
+        self._models: dict[str, tuple] = {}  # pair → (tokenizer, model or translator, device)
+        # pair → backend it was actually loaded with (a pair whose CTranslate2
+        # load failed runs on transformers)
+        self._pair_backends: dict[str, str] = {}
         self._loaded_pairs: set[str] = set()
+        # Pairs with no configured model; checked before retrying load_pair
+        self._missing_pairs: set[str] = set()
+        self._encoders: dict[str, Callable[[str], tuple[int, ...]]] = {}
+        # (pair, prefix, text) → translation, least recently used first
+        self._translations: OrderedDict[tuple[str, str, str], str] = OrderedDict()
+        # (pair, prefix, text) → future of the translation currently queued
+        self._pending: dict[tuple[str, str, str], asyncio.Future] = {}
+        # Per-pair request queue and the worker task that drains it in batches
+        self._queues: dict[str, asyncio.Queue] = {}
+        self._workers: dict[str, asyncio.Task] = {}
 
     def load_pair(self, src: str, tgt: str) -> None:
         """Pre-load a language pair."""
         pair = f"{src}-{tgt}"
-        if pair in self._loaded_pairs:
+        if src == tgt or pair in self._loaded_pairs or pair in self._missing_pairs:
             return
         model_id = self.model_map.get(pair)
         if not model_id:
             logger.warning(f"No MT model for pair {pair}")
+            self._missing_pairs.add(pair)
             return
 
+        if self.backend == "ctranslate2":
+            try:
+                self._load_pair_ct2(pair, model_id)
+                return
+            except ImportError:
+                logger.info("ctranslate2 not installed, falling back to transformers for MT")
+                self.backend = "transformers"
+            except Exception as e:
+                logger.warning(
+                    f"CTranslate2 load failed for {pair}, falling back to transformers: {e}"
+                )
+        self._load_pair_transformers(pair, model_id)
+
+    def _load_pair_ct2(self, pair: str, model_id: str) -> None:
+        """Load (converting on first use) an int8 CTranslate2 model for `pair`."""
+        import ctranslate2
+        from transformers import MarianTokenizer
+
+        ct2_dir = Path(self.cache_dir) / f"{model_id.replace('/', '--')}-ct2-int8"
+        if not (ct2_dir / "model.bin").exists():
+            self._convert_ct2(model_id, ct2_dir)
+
+        # CTranslate2 has no MPS backend
+        effective_device = "cuda" if self.device == "cuda" else "cpu"
+        logger.info(f"Loading MT model: {model_id} (CTranslate2)")
+        tokenizer = MarianTokenizer.from_pretrained(model_id)
+        translator = ctranslate2.Translator(
+            str(ct2_dir),
+            device=effective_device,
+            compute_type=self.compute_type,
+            inter_threads=1,
+            intra_threads=INFERENCE_THREADS,
+        )
+        self._models[pair] = (tokenizer, translator, effective_device)
+        self._pair_backends[pair] = "ctranslate2"
+        self._encoders[pair] = _make_encoder(tokenizer)
+        self._loaded_pairs.add(pair)
+        logger.info(f"MT model loaded: {pair} on {effective_device} (CTranslate2)")
+
+    @staticmethod
+    def _convert_ct2(model_id: str, ct2_dir: Path) -> None:
+        """Convert `model_id` to an int8 CTranslate2 model at `ct2_dir`.
+
+        The conversion is written to a temporary sibling directory and moved
+        into place only once complete, so an interrupted conversion never
+        leaves a half-written `ct2_dir` behind.
+        """
+        from ctranslate2.converters import TransformersConverter
+
+        logger.info(f"Converting MT model to CTranslate2 (int8): {model_id}")
+        ct2_dir.parent.mkdir(parents=True, exist_ok=True)
+        tmp_dir = Path(tempfile.mkdtemp(prefix=f".{ct2_dir.name}-", dir=ct2_dir.parent))
+        try:
+            TransformersConverter(model_id).convert(str(tmp_dir), quantization="int8", force=True)
+            # Leftover from an older, interrupted conversion (no model.bin)
+            shutil.rmtree(ct2_dir, ignore_errors=True)
+            tmp_dir.rename(ct2_dir)
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    def _load_pair_transformers(self, pair: str, model_id: str) -> None:
+        """Load a MarianMT model for `pair` via transformers/PyTorch."""
         try:
             from transformers import MarianTokenizer, MarianMTModel
             import torch
 
             logger.info(f"Loading MT model: {model_id}")
             tokenizer = MarianTokenizer.from_pretrained(model_id)
-            model = MarianMTModel.from_pretrained(model_id)
+            # On CUDA the weights are loaded directly in FP16 (halves weight/
+            # activation traffic per decoder step; input ids stay int64)
+            fp16 = self.device == "cuda" and self.compute_type in ("auto", "float16")
+            model = MarianMTModel.from_pretrained(
+                model_id,
+                torch_dtype=torch.float16 if fp16 else torch.float32,
+                low_cpu_mem_usage=True,
+            )
 
             # Move to device
             effective_device = self.device
@@ -62,42 +220,206 @@ class MTEngine:
                 model = model.to("cpu")
 
             model.eval()
+            dtype = "float16" if fp16 else "float32"
+            if fp16:
+                self._compile_forward(model)
             self._models[pair] = (tokenizer, model, effective_device)
+            self._pair_backends[pair] = "transformers"
+            self._encoders[pair] = _make_encoder(tokenizer)
             self._loaded_pairs.add(pair)
-            logger.info(f"MT model loaded: {pair} on {effective_device}")
+            logger.info(f"MT model loaded: {pair} on {effective_device} ({dtype})")
         except ImportError:
             logger.error("transformers not installed. Run: pip install transformers sentencepiece")
             raise
 
-    async def translate(self, text: str, src: str, tgt: str) -> str:
-        """Translate text from src to tgt language. Returns translated string."""
+    @staticmethod
+    def _compile_forward(model) -> None:
+        """Wrap `model.forward` with torch.compile to fuse pointwise/norm kernels.
+
+        Only forward is compiled so `generate` keeps working unchanged;
+        dynamic shapes avoid a recompile for every new sequence length.
+        torch.compile is lazy, so a short generate runs here to trigger the
+        actual compilation; if it fails the eager forward is restored.
+        """
+        import torch
+
+        eager_forward = model.forward
+        try:
+            model.forward = torch.compile(eager_forward, dynamic=True)
+            dummy = torch.tensor([[model.config.eos_token_id]], device=model.device)
+            with torch.inference_mode():
+                model.generate(input_ids=dummy, max_length=4, num_beams=1, do_sample=False)
+        except Exception as e:
+            model.forward = eager_forward
+            logger.info(f"torch.compile unavailable for MT, running eager: {e}")
+
+    async def translate(self, text: str, src: str, tgt: str, prefix: str = "") -> str:
+        """
+        Translate text from src to tgt language. Returns translated string.
+
+        `prefix` is source text translated together with (before) `text`;
+        the result is the translation of `prefix + " " + text`.
+        """
         if not text or not text.strip():
             return ""
+        if src == tgt:
+            return _join(prefix, text)
 
         pair = f"{src}-{tgt}"
         if pair not in self._models:
+            if pair in self._missing_pairs:
+                return _join(prefix, text)
             self.load_pair(src, tgt)
         if pair not in self._models:
             logger.warning(f"MT pair {pair} not available, returning original")
-            return text
+            return _join(prefix, text)
+
+        key = (pair, prefix, text)
+        cached = self._translations.get(key)
+        if cached is not None:
+            self._translations.move_to_end(key)
+            return cached
 
+        # The worker and its futures belong to the loop that started them; a
+        # cached engine outlives a finished asyncio.run() (whose tasks were
+        # cancelled), so start over when the worker is gone.
         loop = asyncio.get_running_loop()
-        return await loop.run_in_executor(
-            None, self._translate_sync, text, pair
-        )
+        worker = self._workers.get(pair)
+        if worker is None or worker.done() or worker.get_loop() is not loop:
+            self._discard_pending(pair)
+            self._queues[pair] = asyncio.Queue()
+            self._workers[pair] = asyncio.create_task(self._batch_worker(pair))
+
+        pending = self._pending.get(key)
+        if pending is not None:
+            # Shielded: a cancelled waiter must not cancel the shared result
+            return await asyncio.shield(pending)
+
+        future = loop.create_future()
+        self._pending[key] = future
+        await self._queues[pair].put((prefix, text, future))
+        return await asyncio.shield(future)
+
+    async def translate_batch(self, texts: list[str], src: str, tgt: str) -> list[str]:
+        """
+        Translate several segments, returned in order.
+
+        They are queued together, so the pair's worker runs them as one
+        batched model call (split at `max_batch_size`).
+        """
+        return list(await asyncio.gather(*(self.translate(t, src, tgt) for t in texts)))
+
+    async def _batch_worker(self, pair: str) -> None:
+        """Translate queued requests for `pair`, batching whatever has piled up."""
+        queue = self._queues[pair]
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await queue.get()]
+            # No extra wait: requests that arrived while the previous batch
+            # was running are already queued and join this one.
+            while len(batch) < self.max_batch_size and not queue.empty():
+                batch.append(queue.get_nowait())
+
+            segments = [(prefix, text) for prefix, text, _ in batch]
+            try:
+                results = await loop.run_in_executor(
+                    get_inference_executor(), self._translate_batch_sync, segments, pair
+                )
+            except Exception as e:
+                logger.error(f"MT batch error: {e}")
+                results = [_join(prefix, text) for prefix, text in segments]
+            else:
+                # Only model output is cached, never the untranslated fallback
+                for (prefix, text), result in zip(segments, results):
+                    self._remember(pair, prefix, text, result)
+            for (prefix, text, future), result in zip(batch, results):
+                if self._pending.get((pair, prefix, text)) is future:
+                    del self._pending[(pair, prefix, text)]
+                if not future.done():
+                    future.set_result(result)
+
+    def _discard_pending(self, pair: str) -> None:
+        """Cancel and forget the in-flight requests of `pair`'s stopped worker."""
+        for key in [k for k in self._pending if k[0] == pair]:
+            future = self._pending.pop(key)
+            try:
+                future.cancel()
+            except RuntimeError:
+                pass  # its event loop is already closed
+
+    def _remember(self, pair: str, prefix: str, text: str, translation: str) -> None:
+        """Add a translation to the LRU, evicting the oldest entry when full."""
+        self._translations[(pair, prefix, text)] = translation
+        self._translations.move_to_end((pair, prefix, text))
+        if len(self._translations) > _TRANSLATION_CACHE_SIZE:
+            self._translations.popitem(last=False)
+
+    def _source_ids(self, pair: str, prefix: str, text: str) -> list[int]:
+        """Model input ids for `prefix + " " + text`, truncated, with EOS."""
+        encode = self._encoders[pair]
+        ids = list(encode(prefix)) + list(encode(text)) if prefix else list(encode(text))
+        del ids[_MAX_INPUT_TOKENS - 1:]
+        ids.append(self._models[pair][0].eos_token_id)
+        return ids
+
+    def _translate_batch_sync(self, segments: list[tuple[str, str]], pair: str) -> list[str]:
+        """Synchronous batched translation of (prefix, text) segments."""
+        if self._pair_backends[pair] == "ctranslate2":
+            return self._translate_batch_sync_ct2(segments, pair)
 
-    def _translate_sync(self, text: str, pair: str) -> str:
-        """Synchronous translation."""
         import torch
 
         tokenizer, model, device = self._models[pair]
-        try:
-            inputs = tokenizer(text, return_tensors="pt", padding=True, truncation=True, max_length=512)
+        ids = [self._source_ids(pair, prefix, text) for prefix, text in segments]
+        if len(ids) == 1:
+            # Single segment: no padding, so the all-ones attention mask is dropped
+            inputs = {"input_ids": torch.tensor(ids, device=device)}
+        else:
+            inputs = tokenizer.pad({"input_ids": ids}, return_tensors="pt")
             inputs = {k: v.to(device) for k, v in inputs.items()}
-            with torch.no_grad():
-                output_ids = model.generate(**inputs, max_length=512, num_beams=4)
-            result = tokenizer.decode(output_ids[0], skip_special_tokens=True)
-            return result.strip()
-        except Exception as e:
-            logger.error(f"MT error: {e}")
-            return text
+        with torch.inference_mode():
+            output_ids = model.generate(
+                **inputs, max_length=512, num_beams=self.beam_size, do_sample=False
+            )
+        results = tokenizer.batch_decode(output_ids, skip_special_tokens=True)
+        return [r.strip() for r in results]
+
+    def _translate_batch_sync_ct2(self, segments: list[tuple[str, str]], pair: str) -> list[str]:
+        """Synchronous batched translation with a CTranslate2 translator."""
+        tokenizer, translator, _ = self._models[pair]
+        sources = [
+            tokenizer.convert_ids_to_tokens(self._source_ids(pair, prefix, text))
+            for prefix, text in segments
+        ]
+        results = translator.translate_batch(
+            sources, beam_size=self.beam_size, max_decoding_length=512
+        )
+        return [
+            tokenizer.decode(
+                tokenizer.convert_tokens_to_ids(r.hypotheses[0]), skip_special_tokens=True
+            ).strip()
+            for r in results
+        ]
+
+
+@lru_cache(maxsize=8)
+def get_mt_engine(
+    device: str = "cpu",
+    backend: str = "ctranslate2",
+    cache_dir: str = "models",
+    beam_size: int = 1,
+    compute_type: str = "auto",
+    max_batch_size: int = 16,
+) -> MTEngine:
+    """
+    Return an MTEngine shared by calls with the same arguments, so language
+    pairs it has loaded are reused across pipeline runs in one process.
+    """
+    return MTEngine(
+        device=device,
+        backend=backend,
+        cache_dir=cache_dir,
+        beam_size=beam_size,
+        compute_type=compute_type,
+        max_batch_size=max_batch_size,
+    )
@@ -5,7 +5,10 @@ Runs the ASR loop at a fixed interval, feeds hypotheses to the CommitTracker,
 and dispatches committed text to MT+TTS in sequence.
 
 All output is emitted as events to an asyncio.Queue that the WebSocket
-handler reads from.
+handler reads from; synthesized audio goes to a separate bounded queue of
+(segment_id, PCM16 bytes) pairs that the handler forwards as binary frames.
+Each segment's "stats" event is queued behind its audio in that same queue,
+so it reaches the client after the segment's last audio frame.
 """
 
 import asyncio
@@ -15,10 +18,10 @@ import numpy as np
 from dataclasses import dataclass
 from typing import Any
 
-from ..core.audio_buffer import AudioBuffer
+from ..core.audio_buffer import AudioBuffer, _aligned_empty
 from ..core.commit_tracker import CommitTracker, CommitEvent
 from ..core.backpressure import BackpressureController
-from .asr import ASREngine
+from .asr import ASREngine, _compute_rms
 from .mt import MTEngine
 from .tts import TTSEngine
 from ..config import (
@@ -38,6 +41,11 @@ logger = logging.getLogger(__name__)
 # to save CPU cycles.
 _SILENCE_RMS_THRESHOLD = 0.005
 
+# Max TTS audio chunks buffered for the WS sender.  When the client can't
+# keep up, the rest of the segment is dropped rather than stalling the
+# pipeline.  One slot is always kept free for the segment's stats event.
+_TTS_AUDIO_QUEUE_MAX = 64
+
 
 @dataclass
 class PipelineStats:
@@ -47,6 +55,7 @@ class PipelineStats:
     e2e_ms: float = 0.0
     commits_total: int = 0
     tts_queue: int = 0
+    tts_truncated: int = 0
 
 
 class PipelineOrchestrator:
@@ -57,8 +66,11 @@ class PipelineOrchestrator:
       - {"type": "partial_transcript", "text": str}
       - {"type": "committed_transcript", "text": str, "segment_id": int}
       - {"type": "translation_committed", "text": str, "source": str, "segment_id": int}
-      - {"type": "tts_audio_chunk", "data": bytes, "segment_id": int, "is_last": bool}
-      - {"type": "stats", ...}
+
+    Emitted to `audio_queue`, in order per segment:
+      - (segment_id, PCM16 bytes) for each TTS audio chunk
+      - (segment_id, {"type": "stats", "segment_id": int, "tts_chunks": int, ...})
+        marking the end of the segment's audio
     """
 
     def __init__(
@@ -79,6 +91,7 @@ class PipelineOrchestrator:
         self.audio_buffer = AudioBuffer(
             max_duration_sec=max(WINDOW_SEC * 2, 10.0),
             sample_rate=CAPTURE_SAMPLE_RATE,
+            window_sec=WINDOW_SEC,
         )
 
         # Commit tracker
@@ -88,11 +101,17 @@ class PipelineOrchestrator:
             min_words=COMMIT_MIN_WORDS,
         )
 
+        # Reused ASR window (filled in place by the audio buffer every tick)
+        self._window_buf = _aligned_empty(int(WINDOW_SEC * CAPTURE_SAMPLE_RATE), np.float32)
+
         # Backpressure
         self.bp = BackpressureController(queue_max=TTS_QUEUE_MAX)
 
         # Output queue for WS handler
         self.output_queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue()
+        self.audio_queue: asyncio.Queue[tuple[int, bytes | dict[str, Any]]] = asyncio.Queue(
+            maxsize=_TTS_AUDIO_QUEUE_MAX
+        )
 
         # Stats
         self.stats = PipelineStats()
@@ -101,6 +120,9 @@ class PipelineOrchestrator:
         # timeout-commits on silence that slipped past filters.
         self._consecutive_silent_windows = 0
 
+        # Last partial_transcript text sent, to skip re-sending it every tick
+        self._last_partial = ""
+
         # Control
         self._running = False
         self._asr_task: asyncio.Task | None = None
@@ -144,20 +166,32 @@ class PipelineOrchestrator:
     async def _asr_loop(self) -> None:
         """Periodic ASR decode on the sliding window."""
         interval = ASR_INTERVAL_MS / 1000.0
+        loop = asyncio.get_running_loop()
+        # Ticks run on a fixed schedule so a slow decode doesn't stretch the
+        # ASR period to interval + asr_latency.
+        next_deadline = loop.time() + interval
 
         while self._running:
             try:
-                await asyncio.sleep(interval)
+                await asyncio.sleep(max(0.0, next_deadline - loop.time()))
+                now = loop.time()
+                next_deadline += interval
+                if next_deadline <= now:
+                    # More than a full interval behind: drop the missed ticks
+                    # instead of firing them back to back.
+                    missed = int((now - next_deadline) // interval) + 1
+                    logger.debug("ASR loop behind schedule, skipping %d tick(s)", missed)
+                    next_deadline = now + interval
                 if not self._running:
                     break
 
                 # Grab the last WINDOW_SEC seconds
-                audio = self.audio_buffer.get_last(WINDOW_SEC)
+                audio = self.audio_buffer.get_last_into(WINDOW_SEC, self._window_buf)
                 if audio is None or len(audio) < CAPTURE_SAMPLE_RATE * 0.5:
                     continue
 
                 # ── Quick silence check (saves CPU) ──
-                rms = float(np.sqrt(np.mean(audio ** 2)))
+                rms = _compute_rms(audio)
                 if rms < _SILENCE_RMS_THRESHOLD:
                     self._consecutive_silent_windows += 1
                     continue
@@ -166,7 +200,9 @@ class PipelineOrchestrator:
 
                 # ASR
                 t0 = time.monotonic()
-                hypothesis = await self.asr.transcribe(audio, language=self.source_lang)
+                hypothesis = await self.asr.transcribe(
+                    audio, language=self.source_lang, rms=rms
+                )
                 asr_ms = (time.monotonic() - t0) * 1000
                 self.stats.asr_ms = asr_ms
 
@@ -180,7 +216,8 @@ class PipelineOrchestrator:
                 # (the raw hypothesis includes re-transcribed committed text
                 #  from the sliding window — we must not show that)
                 uncommitted = self.commit_tracker.effective_uncommitted_text
-                if uncommitted:
+                if uncommitted and uncommitted != self._last_partial:
+                    self._last_partial = uncommitted
                     await self.output_queue.put({
                         "type": "partial_transcript",
                         "text": uncommitted,
@@ -201,6 +238,10 @@ class PipelineOrchestrator:
         """Translate and synthesize a committed segment."""
         e2e_start = time.monotonic()
 
+        # The client clears its partial on commit, so the next partial must
+        # be sent even if it repeats the previous one.
+        self._last_partial = ""
+
         # Emit committed transcript
         await self.output_queue.put({
             "type": "committed_transcript",
@@ -226,12 +267,17 @@ class PipelineOrchestrator:
         if batched:
             text_to_process = batched + " " + text_to_process
 
-        # MT
-        t0 = time.monotonic()
-        translation = await self.mt.translate(
-            text_to_process, self.source_lang, self.target_lang
-        )
-        mt_ms = (time.monotonic() - t0) * 1000
+        # MT (batched text goes as a prefix so its tokenization is cached).
+        # Same-language sessions (transcription only) skip it entirely.
+        if self.source_lang == self.target_lang:
+            translation = text_to_process
+            mt_ms = 0.0
+        else:
+            t0 = time.monotonic()
+            translation = await self.mt.translate(
+                ev.text, self.source_lang, self.target_lang, prefix=batched or ""
+            )
+            mt_ms = (time.monotonic() - t0) * 1000
         self.stats.mt_ms = mt_ms
 
         await self.output_queue.put({
@@ -245,24 +291,26 @@ class PipelineOrchestrator:
         self.bp.on_tts_queued()
         t0 = time.monotonic()
         chunk_count = 0
-        async for audio_chunk in self.tts.synthesize_streaming(
-            translation, lang=self.target_lang
-        ):
-            chunk_count += 1
-            await self.output_queue.put({
-                "type": "tts_audio_chunk",
-                "data": audio_chunk,
-                "segment_id": ev.segment_id,
-                "is_last": False,
-            })
-
-        # Mark last chunk
-        if chunk_count > 0:
-            # The last item we sent had is_last=False; we send an end marker
-            await self.output_queue.put({
-                "type": "tts_end",
-                "segment_id": ev.segment_id,
-            })
+        truncated = False
+        stream = self.tts.synthesize_streaming(translation, lang=self.target_lang)
+        try:
+            async for audio_chunk in stream:
+                if self.audio_queue.qsize() >= _TTS_AUDIO_QUEUE_MAX - 1:
+                    # Client is not draining audio fast enough: stop
+                    # synthesizing and drop the rest of the segment rather
+                    # than sending it with holes or blocking the pipeline.
+                    truncated = True
+                    break
+                self.audio_queue.put_nowait((ev.segment_id, audio_chunk))
+                chunk_count += 1
+        finally:
+            await stream.aclose()
+        if truncated:
+            self.stats.tts_truncated += 1
+            logger.warning(
+                "Truncated TTS for segment %d after %d chunks (audio queue full)",
+                ev.segment_id, chunk_count,
+            )
 
         tts_ms = (time.monotonic() - t0) * 1000
         self.stats.tts_ms = tts_ms
@@ -272,13 +320,17 @@ class PipelineOrchestrator:
         self.stats.e2e_ms = e2e_ms
         self.stats.tts_queue = self.bp.pending_count
 
-        # Emit stats
-        await self.output_queue.put({
+        # Emit stats behind the segment's audio so it marks the end of it.
+        # The chunk loop above leaves a slot free, so this never blocks.
+        self.audio_queue.put_nowait((ev.segment_id, {
             "type": "stats",
+            "segment_id": ev.segment_id,
+            "tts_chunks": chunk_count,
+            "tts_truncated": truncated,
             "asr_ms": round(self.stats.asr_ms, 1),
             "mt_ms": round(mt_ms, 1),
             "tts_ms": round(tts_ms, 1),
             "e2e_ms": round(e2e_ms, 1),
             "commits_total": self.stats.commits_total,
             "tts_queue": self.stats.tts_queue,
-        })
+        }))
@@ -0,0 +1,55 @@
+"""
+float32 → PCM16 conversion for synthesized audio.
+
+numba is optional: it fuses scale, saturate and round into one compiled
+pass over the samples.  Without it the same steps run as NumPy ops on a
+float32 scratch copy.  Both paths produce identical output.
+
+The kernel is compiled on first call and not cached on disk: numba's cache
+records the importing module name, which differs between the app
+(`app.pipeline.pcm`) and the tests (`backend.app.pipeline.pcm`).
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+if njit is not None:
+    @njit(fastmath=True, boundscheck=False)
+    def _f32_to_pcm16_kernel(src, dst):
+        for i in range(src.shape[0]):
+            v = src[i] * np.float32(32767.0)
+            if v > 32767.0:
+                v = 32767.0
+            elif v < -32767.0:
+                v = -32767.0
+            dst[i] = np.int16(np.rint(v))
+else:
+    _f32_to_pcm16_kernel = None
+
+
+def f32_to_pcm16(x: np.ndarray, out: np.ndarray, overwrite_x: bool = False) -> None:
+    """
+    Write the 1-D float32 waveform `x` (nominally [-1, 1]) into the int16
+    array `out` of the same length: scaled by 32767, saturated to
+    ±32767 and rounded to nearest.
+
+    `x` is left untouched unless `overwrite_x` is set, in which case the
+    NumPy fallback scales/clips/rounds a C-contiguous float32 `x` in place
+    (NumPy's vectorized loops want contiguous data) instead of allocating
+    a scratch copy.
+    """
+    if _f32_to_pcm16_kernel is not None:
+        _f32_to_pcm16_kernel(x, out)
+        return
+    if overwrite_x and x.dtype == np.float32 and x.flags.c_contiguous and x.flags.writeable:
+        scratch = x
+        np.multiply(x, np.float32(32767.0), out=scratch)
+    else:
+        scratch = np.multiply(x, np.float32(32767.0), dtype=np.float32)
+    np.clip(scratch, -32767.0, 32767.0, out=scratch)
+    np.rint(scratch, out=scratch)
+    np.copyto(out, scratch, casting="unsafe")
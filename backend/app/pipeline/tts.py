@@ -6,19 +6,40 @@ Supports two backends:
   2. qwen3-tts (high quality, requires GPU + model download)
 
 Both emit audio as PCM16 bytes in chunks for real-time playback.
+
+Concurrent Qwen3-TTS requests (several sessions synthesizing at once) are
+coalesced by a worker task into a single batched generate() call.
 """
 
 import asyncio
-import io
 import logging
-import struct
-import tempfile
+import shutil
+import subprocess
 import numpy as np
-from pathlib import Path
-from typing import AsyncGenerator
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import AsyncGenerator, Iterator
+
+from .pcm import f32_to_pcm16
 
 logger = logging.getLogger(__name__)
 
+# Upper bound on Qwen3-TTS prompts generated in one batched call
+_MAX_GEN_BATCH_SIZE = 8
+
+
+def _float_to_pcm16(audio: np.ndarray) -> np.ndarray:
+    """
+    Convert a 1-D [-1, 1] waveform to a new int16 array.
+
+    `audio` may be clobbered (when it is already contiguous float32 and
+    numba is unavailable): callers pass decode output they no longer need.
+    """
+    audio = np.ascontiguousarray(audio, dtype=np.float32)
+    out = np.empty(audio.shape, dtype=np.int16)
+    f32_to_pcm16(audio, out, overwrite_x=True)
+    return out
+
 
 class TTSEngine:
     """
@@ -39,25 +60,47 @@ class TTSEngine:
         device: str = "cpu",
         output_sample_rate: int = 24000,
         chunk_duration_ms: int = 200,
+        compute_type: str = "auto",
     ):
         self.backend = backend
         self.qwen3_model = qwen3_model
         self.device = device
+        # Qwen3-TTS precision: "auto" (float16 on CUDA/MPS, bfloat16 on CPUs
+        # with native BF16 else float32), "int8" (bitsandbytes, CUDA only),
+        # "bfloat16", "float16" or "float32"
+        self.compute_type = compute_type
         self.output_sample_rate = output_sample_rate
         self.chunk_samples = int(output_sample_rate * chunk_duration_ms / 1000)
+        self.chunk_bytes = self.chunk_samples * 2  # 2 bytes per int16 sample
+        # Sent when Qwen3 synthesis fails; built once
+        self._silence_chunk = bytes(self.chunk_bytes)
         self._loaded = False
-
-        # Voice settings (MVP: fixed voice per language)
-        self._voice_map = {
+        # Resolved once in load(); edge-tts MP3 is decoded by piping through it
+        self._ffmpeg: str | None = None
+        self._edge_tts = None  # edge_tts module, imported in load()
+        # Qwen3-TTS generate() request queue and the worker that batches it
+        self._gen_queue: asyncio.Queue | None = None
+        self._gen_worker: asyncio.Task | None = None
+        # Dedicated thread for Qwen3 generate/decode, created in _load_qwen3
+        self._gen_executor: ThreadPoolExecutor | None = None
+
+        # Voice settings (MVP: fixed voice per language, resolved here so
+        # synthesis does a single lookup; other languages get the English voice)
+        self._voice_by_lang = {
             "en": "en-US-AriaNeural",
             "es": "es-ES-ElviraNeural",
         }
+        self._default_voice = self._voice_by_lang["en"]
 
     def load(self) -> None:
         """Load TTS model/backend."""
         if self.backend == "edge-tts":
             try:
-                import edge_tts  # noqa: F401
+                import edge_tts
+                self._edge_tts = edge_tts
+                self._ffmpeg = self._probe_ffmpeg()
+                if self._ffmpeg is None:
+                    logger.error("ffmpeg not found; edge-tts audio cannot be decoded. Install ffmpeg.")
                 self._loaded = True
                 logger.info("TTS loaded: edge-tts (lightweight)")
             except ImportError:
@@ -66,9 +109,27 @@ class TTSEngine:
 
         elif self.backend == "qwen3":
             self._load_qwen3()
+            # Compile the PCM conversion kernel now rather than on first audio
+            _float_to_pcm16(np.zeros(1, dtype=np.float32))
         else:
             raise ValueError(f"Unknown TTS backend: {self.backend}")
 
+    @staticmethod
+    def _probe_ffmpeg() -> str | None:
+        """Path of a working ffmpeg binary, or None."""
+        path = shutil.which("ffmpeg")
+        if path is None:
+            return None
+        try:
+            subprocess.run(
+                [path, "-version"], check=True, timeout=10,
+                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            )
+        except (OSError, subprocess.SubprocessError) as e:
+            logger.error(f"ffmpeg at {path} is not usable: {e}")
+            return None
+        return path
+
     def _load_qwen3(self) -> None:
         """Load Qwen3-TTS model."""
         try:
@@ -76,30 +137,49 @@ class TTSEngine:
             import torch
 
             logger.info(f"Loading Qwen3-TTS: {self.qwen3_model}")
+            # Generation is already serialized by the batch worker; one
+            # dedicated thread keeps it from queueing behind ASR/MT calls.
+            self._gen_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="qwen3-gen")
             self._qwen3_tokenizer = AutoTokenizer.from_pretrained(
                 self.qwen3_model, trust_remote_code=True
             )
+
+            effective_device = self.device
+            if effective_device == "cuda" and self.compute_type == "int8":
+                model = self._load_qwen3_int8()
+                if model is not None:
+                    self._qwen3_model = model.eval()
+                    self._qwen3_device = "cuda"
+                    self._loaded = True
+                    logger.info("Qwen3-TTS loaded on cuda (int8)")
+                    return
+
+            cpu_dtype = self._qwen3_cpu_dtype()
+            dtype = cpu_dtype if effective_device == "cpu" else self._qwen3_gpu_dtype()
+            # low_cpu_mem_usage: weights are loaded straight in `dtype`
+            # instead of materializing a full fp32 copy first
             self._qwen3_model = AutoModelForCausalLM.from_pretrained(
-                self.qwen3_model, trust_remote_code=True, torch_dtype=torch.float16
+                self.qwen3_model, trust_remote_code=True, torch_dtype=dtype,
+                low_cpu_mem_usage=True,
             )
 
-            effective_device = self.device
             if effective_device == "mps":
                 try:
                     self._qwen3_model = self._qwen3_model.to("mps")
                 except Exception:
                     logger.info("MPS not supported for Qwen3-TTS, using CPU")
-                    self._qwen3_model = self._qwen3_model.to("cpu").float()
+                    self._qwen3_model = self._qwen3_model.to("cpu", dtype=cpu_dtype)
                     effective_device = "cpu"
+                    dtype = cpu_dtype
             elif effective_device == "cuda":
                 self._qwen3_model = self._qwen3_model.to("cuda")
             else:
-                self._qwen3_model = self._qwen3_model.to("cpu").float()
+                self._qwen3_model = self._qwen3_model.to("cpu")
 
             self._qwen3_model.eval()
             self._qwen3_device = effective_device
             self._loaded = True
-            logger.info(f"Qwen3-TTS loaded on {effective_device}")
+            logger.info(f"Qwen3-TTS loaded on {effective_device} ({dtype})")
 
         except Exception as e:
             logger.error(f"Failed to load Qwen3-TTS: {e}")
@@ -107,12 +187,48 @@ class TTSEngine:
             self.backend = "edge-tts"
             self.load()
 
+    def _qwen3_gpu_dtype(self):
+        import torch
+
+        if self.compute_type in ("bfloat16", "float32"):
+            return getattr(torch, self.compute_type)
+        return torch.float16
+
+    def _qwen3_cpu_dtype(self):
+        """bfloat16 where the CPU computes it natively (AVX512-BF16/AMX), else float32."""
+        import torch
+
+        if self.compute_type in ("bfloat16", "float32"):
+            return getattr(torch, self.compute_type)
+        if self.compute_type == "auto":
+            native_bf16 = getattr(torch.cpu, "_is_avx512_bf16_supported", None)
+            if native_bf16 is not None and native_bf16():
+                return torch.bfloat16
+        # float16 matmuls are emulated (slow) on most CPUs
+        return torch.float32
+
+    def _load_qwen3_int8(self):
+        """Load Qwen3-TTS with bitsandbytes int8 weights; None if unavailable."""
+        try:
+            from transformers import AutoModelForCausalLM, BitsAndBytesConfig
+
+            return AutoModelForCausalLM.from_pretrained(
+                self.qwen3_model,
+                trust_remote_code=True,
+                quantization_config=BitsAndBytesConfig(load_in_8bit=True),
+                device_map="auto",
+            )
+        except Exception as e:
+            logger.warning(f"Qwen3-TTS int8 load failed, using float16: {e}")
+            return None
+
     async def synthesize_streaming(
         self, text: str, lang: str = "en"
     ) -> AsyncGenerator[bytes, None]:
         """
         Synthesize text and yield PCM16 mono audio chunks.
-        Each chunk is `chunk_duration_ms` of audio.
+        Each chunk is `chunk_duration_ms` of audio, as a bytes-like object
+        (bytes, or a memoryview slice of the synthesized buffer).
         """
         if not text.strip():
             return
@@ -132,73 +248,68 @@ class TTSEngine:
     async def _synth_edge_tts(
         self, text: str, lang: str
     ) -> AsyncGenerator[bytes, None]:
-        """Use edge-tts to synthesize and yield PCM16 chunks."""
-        import edge_tts
-
-        voice = self._voice_map.get(lang, "en-US-AriaNeural")
-
-        try:
-            communicate = edge_tts.Communicate(text, voice)
-            pcm_buffer = bytearray()
-
-            # edge-tts yields MP3 chunks; we need to collect and convert
-            mp3_buffer = bytearray()
-            async for chunk_data in communicate.stream():
-                if chunk_data["type"] == "audio":
-                    mp3_buffer.extend(chunk_data["data"])
-
-            if not mp3_buffer:
-                return
-
-            # Convert MP3 to PCM16 using pydub or ffmpeg
-            pcm_data = await self._mp3_to_pcm16(bytes(mp3_buffer))
-            if pcm_data is None:
-                return
-
-            # Yield in chunks
-            chunk_bytes = self.chunk_samples * 2  # 2 bytes per int16 sample
-            for i in range(0, len(pcm_data), chunk_bytes):
-                chunk = pcm_data[i : i + chunk_bytes]
-                if len(chunk) > 0:
-                    yield bytes(chunk)
-
-        except Exception as e:
-            logger.error(f"edge-tts synthesis error: {e}")
-
-    async def _mp3_to_pcm16(self, mp3_data: bytes) -> bytes | None:
-        """Convert MP3 bytes to PCM16 mono at output_sample_rate."""
-        try:
-            # Try pydub first
-            from pydub import AudioSegment
+        """
+        Use edge-tts to synthesize and yield PCM16 chunks.
 
-            audio = AudioSegment.from_mp3(io.BytesIO(mp3_data))
-            audio = audio.set_channels(1).set_frame_rate(self.output_sample_rate).set_sample_width(2)
-            return audio.raw_data
-        except ImportError:
-            pass
+        MP3 chunks are piped into an ffmpeg decoder as edge-tts produces
+        them and PCM is read back concurrently, so the first chunk is
+        yielded as soon as it is decoded rather than after the whole
+        utterance has been synthesized.
+        """
+        if self._ffmpeg is None:
+            return
+        voice = self._voice_by_lang.get(lang, self._default_voice)
+        communicate = self._edge_tts.Communicate(text, voice)
 
-        # Fallback: use ffmpeg via subprocess
         try:
+            # Spawned up front so ffmpeg startup overlaps the edge-tts request
             proc = await asyncio.create_subprocess_exec(
-                "ffmpeg", "-i", "pipe:0",
+                self._ffmpeg, "-hide_banner", "-loglevel", "error",
+                "-f", "mp3", "-i", "pipe:0",
                 "-f", "s16le", "-ar", str(self.output_sample_rate),
                 "-ac", "1", "pipe:1",
                 stdin=asyncio.subprocess.PIPE,
                 stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-            )
-            stdout, stderr = await proc.communicate(input=mp3_data)
-            if proc.returncode == 0:
-                return stdout
-            else:
-                logger.error(f"ffmpeg error: {stderr.decode()[:200]}")
-                return None
-        except FileNotFoundError:
-            logger.error(
-                "Neither pydub nor ffmpeg found. "
-                "Install: pip install pydub OR brew install ffmpeg"
+                stderr=asyncio.subprocess.DEVNULL,
             )
-            return None
+        except OSError as e:
+            logger.error(f"Failed to start ffmpeg: {e}")
+            return
+
+        feeder = asyncio.create_task(self._feed_mp3(communicate, proc.stdin))
+        chunk_bytes = self.chunk_bytes
+        read_chunk = proc.stdout.readexactly
+        try:
+            while True:
+                try:
+                    yield await read_chunk(chunk_bytes)
+                except asyncio.IncompleteReadError as e:
+                    # Decoder finished: flush the final partial chunk
+                    if e.partial:
+                        yield e.partial
+                    break
+            await feeder  # surface edge-tts errors
+            if await proc.wait() != 0:
+                logger.error(f"ffmpeg exited with code {proc.returncode}")
+        except Exception as e:
+            logger.error(f"edge-tts synthesis error: {e}")
+        finally:
+            if not feeder.done():
+                feeder.cancel()
+            if proc.returncode is None:
+                proc.kill()
+                await proc.wait()
+
+    @staticmethod
+    async def _feed_mp3(communicate, stdin: asyncio.StreamWriter) -> None:
+        """Write edge-tts MP3 chunks into the decoder as they arrive."""
+        try:
+            async for chunk_data in communicate.stream():
+                if chunk_data["type"] == "audio":
+                    stdin.write(chunk_data["data"])
+                    await stdin.drain()
+        finally:
+            stdin.close()
 
     # ── Qwen3-TTS backend ────────────────────────────────
 
@@ -212,57 +323,163 @@ class TTSEngine:
         We generate tokens incrementally and decode them to PCM in chunks.
         """
         try:
-            import torch
-
             loop = asyncio.get_running_loop()
 
             # Build the prompt for Qwen3-TTS
             prompt = f"<|text|>{text}<|endoftext|>"
-            input_ids = self._qwen3_tokenizer.encode(prompt, return_tensors="pt")
-            input_ids = input_ids.to(self._qwen3_device)
 
-            # Generate audio tokens (streaming)
+            # Generate audio tokens, batched with other sessions' requests
             # Note: actual Qwen3-TTS API may differ; this is the expected pattern
-            audio_tokens = await loop.run_in_executor(
-                None,
-                lambda: self._qwen3_model.generate(
-                    input_ids,
-                    max_new_tokens=2048,
-                    do_sample=True,
-                    temperature=0.7,
-                ),
-            )
-
-            # Decode tokens to audio waveform
-            # This depends on Qwen3-TTS's specific codec
-            audio_array = await loop.run_in_executor(
-                None, self._decode_qwen3_tokens, audio_tokens
-            )
-
-            if audio_array is not None:
-                pcm16 = (np.clip(audio_array, -1, 1) * 32767).astype(np.int16)
-                pcm_bytes = pcm16.tobytes()
-
-                chunk_bytes = self.chunk_samples * 2
-                for i in range(0, len(pcm_bytes), chunk_bytes):
-                    yield pcm_bytes[i : i + chunk_bytes]
+            if self._gen_worker is None or self._gen_worker.done():
+                self._gen_queue = asyncio.Queue()
+                self._gen_worker = asyncio.create_task(self._qwen3_batch_worker())
+            future = loop.create_future()
+            await self._gen_queue.put((prompt, future))
+            audio_tokens = await future
+
+            # Decode tokens to audio one window at a time, so only about
+            # half a second of PCM is materialized per step
+            windows = self._decode_qwen3_tokens_iter(audio_tokens)
+            chunk_bytes = self.chunk_bytes
+            carry = b""  # tail of the previous window, short of a full chunk
+            while True:
+                audio_array = await loop.run_in_executor(
+                    self._gen_executor, next, windows, None
+                )
+                if audio_array is None:
+                    break
+                # Chunks are zero-copy slices of the int16 buffer (no tobytes())
+                pcm_view = memoryview(_float_to_pcm16(audio_array)).cast("B")
+                start = 0
+                if carry:
+                    start = chunk_bytes - len(carry)
+                    if len(pcm_view) < start:
+                        carry += pcm_view
+                        continue
+                    yield carry + pcm_view[:start]
+                end = start + (len(pcm_view) - start) // chunk_bytes * chunk_bytes
+                for i in range(start, end, chunk_bytes):
+                    yield pcm_view[i : i + chunk_bytes]
+                carry = bytes(pcm_view[end:])
+            if carry:
+                yield carry
 
         except Exception as e:
             logger.error(f"Qwen3-TTS synthesis error: {e}")
             # Fallback: generate silence
-            silence = np.zeros(self.chunk_samples, dtype=np.int16)
-            yield silence.tobytes()
-
-    def _decode_qwen3_tokens(self, tokens) -> np.ndarray | None:
-        """Decode Qwen3-TTS audio tokens to float32 waveform."""
+            yield self._silence_chunk
+
+    async def _qwen3_batch_worker(self) -> None:
+        """Run queued Qwen3-TTS prompts through generate(), batching whatever has piled up."""
+        queue = self._gen_queue
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await queue.get()]
+            # No extra wait: requests that arrived while the previous batch
+            # was generating are already queued and join this one.
+            while len(batch) < _MAX_GEN_BATCH_SIZE and not queue.empty():
+                batch.append(queue.get_nowait())
+
+            prompts = [prompt for prompt, _ in batch]
+            try:
+                results = await loop.run_in_executor(
+                    self._gen_executor, self._generate_qwen3_batch, prompts
+                )
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for (_, future), tokens in zip(batch, results):
+                if not future.done():
+                    future.set_result(tokens)
+
+    def _generate_qwen3_batch(self, prompts: list[str]) -> list:
+        """Synchronous batched generate(); returns one (1, seq) token tensor per prompt."""
+        import torch
+
+        tokenizer = self._qwen3_tokenizer
+        if len(prompts) == 1:
+            inputs = {"input_ids": tokenizer.encode(prompts[0], return_tensors="pt")}
+        else:
+            # Decoder-only model: left-pad so every prompt ends where generation starts
+            tokenizer.padding_side = "left"
+            if tokenizer.pad_token_id is None:
+                tokenizer.pad_token = tokenizer.eos_token
+            inputs = dict(tokenizer(prompts, return_tensors="pt", padding=True))
+        inputs = {k: v.to(self._qwen3_device) for k, v in inputs.items()}
+        pad_id = tokenizer.pad_token_id if tokenizer.pad_token_id is not None else tokenizer.eos_token_id
+
+        with torch.inference_mode():
+            output = self._qwen3_model.generate(
+                **inputs,
+                max_new_tokens=2048,
+                do_sample=True,
+                temperature=0.7,
+                pad_token_id=pad_id,
+            )
+        if len(prompts) == 1:
+            return [output]
+        # Strip each row's left padding and the padding generated after it
+        # finished, so callers see the same layout as an unbatched call
+        results = []
+        for i, left in enumerate((inputs["attention_mask"] == 0).sum(dim=1).tolist()):
+            row = output[i, left:]
+            kept = (row != pad_id).nonzero()
+            end = int(kept[-1]) + 1 if len(kept) else 0
+            results.append(row[:end].unsqueeze(0))
+        return results
+
+    def _decode_qwen3_tokens_iter(
+        self, tokens, window_tokens: int = 6
+    ) -> Iterator[np.ndarray]:
+        """
+        Decode Qwen3-TTS audio tokens to float32 waveform, `window_tokens`
+        at a time (6 tokens = 0.5s at 12Hz), yielding one array per window.
+        """
         try:
             # The actual decoding depends on Qwen3-TTS's codec architecture.
             # This is a placeholder that should be updated when the official
             # Qwen3-TTS package is available.
             # For now, we generate a placeholder sine wave.
-            duration = len(tokens[0]) * (1.0 / 12.0)  # 12Hz tokenizer
-            t = np.linspace(0, duration, int(duration * self.output_sample_rate))
-            return np.sin(2 * np.pi * 440 * t).astype(np.float32) * 0.3
+            n_tokens = len(tokens[0])
+            samples_per_token = self.output_sample_rate / 12.0  # 12Hz tokenizer
+            phase_step = np.float32(2 * np.pi * 440.0 / self.output_sample_rate)
+            for t0 in range(0, n_tokens, window_tokens):
+                t1 = min(t0 + window_tokens, n_tokens)
+                # Absolute sample indices keep the phase continuous across windows
+                out = np.arange(
+                    int(t0 * samples_per_token), int(t1 * samples_per_token),
+                    dtype=np.float32,
+                )
+                out *= phase_step
+                np.sin(out, out=out)
+                out *= np.float32(0.3)
+                yield out
         except Exception as e:
             logger.error(f"Qwen3 token decode error: {e}")
-            return None
+
+
+@lru_cache(maxsize=8)
+def get_tts_engine(
+    backend: str = "edge-tts",
+    qwen3_model: str = "Qwen/Qwen3-TTS-0.6B",
+    device: str = "cpu",
+    output_sample_rate: int = 24000,
+    compute_type: str = "auto",
+) -> TTSEngine:
+    """
+    Return a loaded TTSEngine, shared by calls with the same arguments.
+
+    For scripts that run the pipeline several times in one process; the
+    server builds its engines once at startup.
+    """
+    engine = TTSEngine(
+        backend=backend,
+        qwen3_model=qwen3_model,
+        device=device,
+        output_sample_rate=output_sample_rate,
+        compute_type=compute_type,
+    )
+    engine.load()
+    return engine
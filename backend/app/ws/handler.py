@@ -1,44 +1,66 @@
 """
 WebSocket handler for /ws/stream.
 
-Protocol (all messages are JSON text frames except audio):
+Protocol (JSON text frames for control/events, binary frames for audio):
+
+Binary audio frame:  1-byte type (0x01 = audio) + uint32 little-endian id
+                     + raw PCM16 mono samples.
 
 Client → Server:
   Text:  {"type":"config", "source_lang":"es", "target_lang":"en"}
-  Text:  {"type":"audio", "seq": N, "sample_rate": 16000, "pcm16_base64": "..."}
+  Binary: audio frame, id = seq, PCM16 @ 16000 Hz
+  Text:  {"type":"audio", "seq": N, "sample_rate": 16000, "pcm16_base64": "..."}  (legacy)
   Text:  {"type":"stop"}
 
 Server → Client:
   Text:  {"type":"partial_transcript", "text":"..."}
   Text:  {"type":"committed_transcript", "text":"...", "segment_id": N}
   Text:  {"type":"translation_committed", "text":"...", "source":"...", "segment_id": N}
-  Text:  {"type":"tts_audio_chunk", "audio_b64":"...", "segment_id": N, "sample_rate": 24000}
-  Text:  {"type":"tts_end", "segment_id": N}
-  Text:  {"type":"stats", "asr_ms":..., "mt_ms":..., "tts_ms":..., "e2e_ms":...}
+  Binary: audio frame, id = segment_id, TTS PCM16 @ TTS_SAMPLE_RATE
+  Text:  {"type":"stats", "segment_id": N, "tts_chunks": N, "tts_truncated": bool, "asr_ms":..., "mt_ms":..., "tts_ms":..., "e2e_ms":...}
   Text:  {"type":"error", "message":"..."}
   Text:  {"type":"ready"}
 
-Design decision: We use JSON+base64 for audio instead of raw binary frames.
-Rationale: simpler debugging, universal browser support, acceptable overhead
-for the output audio rate (~3KB/200ms chunk). For the input audio we also
-use base64 to keep a uniform protocol.  A future optimization can switch
-input to binary frames with a 1-byte type header.
+Design decision: audio travels in binary frames so no chunk pays for base64
+(+33% bytes) or JSON on either end; the per-segment "stats" event is sent by
+the audio sender right after the segment's last audio frame, so it marks the
+end of that segment's audio.  JSON+base64 input is still accepted for simple
+test clients.
 """
 
 import asyncio
-import base64
 import json
 import logging
+import struct
 from fastapi import WebSocket, WebSocketDisconnect
 
+from ..core.b64 import b64decode
 from ..pipeline.orchestrator import PipelineOrchestrator
 from ..pipeline.asr import ASREngine
 from ..pipeline.mt import MTEngine
 from ..pipeline.tts import TTSEngine
-from ..config import TTS_SAMPLE_RATE
 
 logger = logging.getLogger(__name__)
 
+# orjson is optional: several times faster than the stdlib on the small
+# event dicts sent per frame.  Its JSONDecodeError subclasses the stdlib one.
+try:
+    import orjson
+
+    def _dumps(data: dict) -> str:
+        return orjson.dumps(data).decode()
+
+    _loads = orjson.loads
+except ImportError:
+    def _dumps(data: dict) -> str:
+        return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+
+    _loads = json.loads
+
+# Binary frame header: type tag + little-endian uint32 (seq or segment_id)
+BINARY_AUDIO = 0x01
+_BINARY_HEADER = struct.Struct("<BI")
+
 
 class StreamSession:
     """Manages one WebSocket streaming session."""
@@ -56,6 +78,9 @@ class StreamSession:
         self.tts_engine = tts_engine
         self.pipeline: PipelineOrchestrator | None = None
         self._sender_task: asyncio.Task | None = None
+        self._audio_sender_task: asyncio.Task | None = None
+        # Serializes WS sends between the event and audio sender tasks
+        self._send_lock = asyncio.Lock()
 
     async def run(self) -> None:
         """Main session loop."""
@@ -73,8 +98,9 @@ class StreamSession:
             source_lang = config.get("source_lang", "es")
             target_lang = config.get("target_lang", "en")
 
-            # Pre-load MT pair
-            self.mt_engine.load_pair(source_lang, target_lang)
+            # Pre-load MT pair (a first-time CTranslate2 conversion can take
+            # a while; keep it off the event loop shared by all sessions)
+            await asyncio.to_thread(self.mt_engine.load_pair, source_lang, target_lang)
 
             # Create pipeline
             self.pipeline = PipelineOrchestrator(
@@ -86,8 +112,8 @@ class StreamSession:
             )
             self.pipeline.start()
 
-            # Start sender task (reads from pipeline output queue → WS)
-            self._sender_task = asyncio.create_task(self._sender_loop())
+            # Start sender tasks (pipeline output/audio queues → WS)
+            self._start_senders()
 
             await self._send_json({"type": "ready"})
             logger.info(f"Session ready: {source_lang} → {target_lang}")
@@ -105,17 +131,28 @@ class StreamSession:
     async def _receiver_loop(self) -> None:
         """Receive audio chunks and control messages from the client."""
         while True:
-            msg = await self._recv_json()
+            msg = await self._recv_message()
             if msg is None:
                 break
 
+            if isinstance(msg, bytes):
+                if len(msg) > _BINARY_HEADER.size and msg[0] == BINARY_AUDIO:
+                    try:
+                        # Skip the header without copying the samples
+                        self.pipeline.feed_audio(memoryview(msg)[_BINARY_HEADER.size:])
+                    except Exception as e:
+                        logger.warning(f"Audio decode error: {e}")
+                else:
+                    logger.warning(f"Ignoring binary frame (type={msg[:1].hex()}, {len(msg)} bytes)")
+                continue
+
             msg_type = msg.get("type")
 
             if msg_type == "audio":
                 pcm_b64 = msg.get("pcm16_base64", "")
                 if pcm_b64:
                     try:
-                        pcm_bytes = base64.b64decode(pcm_b64)
+                        pcm_bytes = b64decode(pcm_b64)
                         self.pipeline.feed_audio(pcm_bytes)
                     except Exception as e:
                         logger.warning(f"Audio decode error: {e}")
@@ -129,10 +166,13 @@ class StreamSession:
                 source_lang = msg.get("source_lang", "es")
                 target_lang = msg.get("target_lang", "en")
                 logger.info(f"Config update: {source_lang} → {target_lang}")
-                # Restart pipeline with new config
+                # Restart pipeline with new config.  The senders are bound
+                # to the old pipeline's queues: let them flush its final
+                # events, then start fresh ones on the new pipeline.
                 if self.pipeline:
                     await self.pipeline.stop()
-                self.mt_engine.load_pair(source_lang, target_lang)
+                    await self._drain_senders()
+                await asyncio.to_thread(self.mt_engine.load_pair, source_lang, target_lang)
                 self.pipeline = PipelineOrchestrator(
                     asr_engine=self.asr_engine,
                     mt_engine=self.mt_engine,
@@ -141,26 +181,39 @@ class StreamSession:
                     target_lang=target_lang,
                 )
                 self.pipeline.start()
-
-    async def _sender_loop(self) -> None:
+                self._start_senders()
+
+    def _start_senders(self) -> None:
+        """Start the sender tasks on the current pipeline's queues."""
+        self._sender_task = asyncio.create_task(
+            self._sender_loop(self.pipeline.output_queue)
+        )
+        self._audio_sender_task = asyncio.create_task(
+            self._audio_sender_loop(self.pipeline.audio_queue)
+        )
+
+    async def _drain_senders(self) -> None:
+        """Send whatever is queued, then stop the sender tasks."""
+        for queue, task in (
+            (self.pipeline.output_queue, self._sender_task),
+            (self.pipeline.audio_queue, self._audio_sender_task),
+        ):
+            if task and not task.done():
+                await queue.put(None)  # sentinel: stop after the queued items
+                await task
+
+    async def _sender_loop(self, queue: asyncio.Queue) -> None:
         """Read events from the pipeline output queue and send to WS."""
         while True:
+            # Blocks until an event arrives; cancellation ends the loop
             try:
-                event = await asyncio.wait_for(
-                    self.pipeline.output_queue.get(), timeout=1.0
-                )
-            except asyncio.TimeoutError:
-                continue
+                event = await queue.get()
             except asyncio.CancelledError:
                 break
+            if event is None:
+                break
 
             try:
-                if event["type"] == "tts_audio_chunk":
-                    # Convert audio bytes to base64 for JSON transport
-                    audio_data = event.pop("data", b"")
-                    event["audio_b64"] = base64.b64encode(audio_data).decode("ascii")
-                    event["sample_rate"] = TTS_SAMPLE_RATE
-
                 await self._send_json(event)
 
             except WebSocketDisconnect:
@@ -169,33 +222,76 @@ class StreamSession:
                 logger.error(f"Sender error: {e}")
                 break
 
-    async def _cleanup(self) -> None:
-        """Clean up resources."""
-        if self._sender_task:
-            self._sender_task.cancel()
+    async def _audio_sender_loop(self, queue: asyncio.Queue) -> None:
+        """
+        Forward TTS audio chunks from the pipeline as binary WS frames.
+
+        The segment's "stats" event is queued behind its audio and sent here
+        as JSON, keeping it ordered after the segment's last audio frame.
+        """
+        while True:
             try:
-                await self._sender_task
+                item = await queue.get()
             except asyncio.CancelledError:
-                pass
+                break
+            if item is None:
+                break
+            segment_id, chunk = item
+            if isinstance(chunk, dict):
+                await self._send_json(chunk)
+                continue
+
+            try:
+                frame = _BINARY_HEADER.pack(BINARY_AUDIO, segment_id & 0xFFFFFFFF) + chunk
+                async with self._send_lock:
+                    await self.ws.send_bytes(frame)
+            except WebSocketDisconnect:
+                break
+            except Exception as e:
+                logger.error(f"Audio sender error: {e}")
+                break
+
+    async def _cleanup(self) -> None:
+        """Clean up resources."""
+        for task in (self._sender_task, self._audio_sender_task):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
         if self.pipeline:
             await self.pipeline.stop()
         logger.info("Session cleaned up")
 
     # ── helpers ───────────────────────────────────────────
 
-    async def _recv_json(self) -> dict | None:
+    async def _recv_message(self) -> dict | bytes | None:
+        """Next client message: parsed JSON (text frame) or raw bytes (binary frame)."""
         try:
-            text = await self.ws.receive_text()
-            return json.loads(text)
+            message = await self.ws.receive()
         except (WebSocketDisconnect, RuntimeError):
             return None
+        if message["type"] == "websocket.disconnect":
+            return None
+        data = message.get("bytes")
+        if data is not None:
+            return data
+        try:
+            return _loads(message.get("text") or "")
         except json.JSONDecodeError as e:
             logger.warning(f"Invalid JSON from client: {e}")
             return None
 
+    async def _recv_json(self) -> dict | None:
+        """Next client message if it is a JSON text frame, else None."""
+        msg = await self._recv_message()
+        return msg if isinstance(msg, dict) else None
+
     async def _send_json(self, data: dict) -> None:
         try:
-            await self.ws.send_json(data)
+            async with self._send_lock:
+                await self.ws.send_text(_dumps(data))
         except Exception:
             pass
 
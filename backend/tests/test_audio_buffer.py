@@ -9,78 +9,171 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 from backend.app.core.audio_buffer import AudioBuffer
 
 
+@pytest.fixture(scope="module")
+def ones_1s():
+    """One second of 1.0 samples @ 16 kHz, shared read-only by the tests."""
+    return np.ones(16000, dtype=np.float32)
+
+
 class TestAudioBuffer:
-    def test_add_chunk_basic(self):
+    def test_append_basic(self, ones_1s):
         """Test adding a single chunk to the buffer."""
         buf = AudioBuffer(sample_rate=16000, max_duration_sec=5.0)
-        chunk = np.ones(1600, dtype=np.float32) * 0.5
-        buf.add_chunk(chunk)
-        assert len(buf.buffer) == 1600
-        assert buf.total_samples_processed == 1600
+        chunk = ones_1s[:1600] * 0.5
+        buf.append(chunk)
+        assert buf.duration_available_sec == 0.1
+        assert buf.total_samples_written == 1600
 
-    def test_circular_eviction(self):
+    def test_circular_eviction(self, ones_1s):
         """Test that buffer evicts old samples when full."""
         buf = AudioBuffer(sample_rate=16000, max_duration_sec=1.0)  # 16000 max samples
         
         # Add 2 seconds worth of data (should evict first second)
-        chunk1 = np.ones(16000, dtype=np.float32) * 0.3
-        chunk2 = np.ones(16000, dtype=np.float32) * 0.7
+        chunk1 = ones_1s * 0.3
+        chunk2 = ones_1s * 0.7
         
-        buf.add_chunk(chunk1)
-        buf.add_chunk(chunk2)
+        buf.append(chunk1)
+        buf.append(chunk2)
         
         # Buffer should only have 16000 samples (max 1s)
-        assert len(buf.buffer) == 16000
+        assert buf.duration_available_sec == 1.0
         # The remaining samples should be from chunk2
-        window = buf.get_latest_window(1.0)
+        window = buf.get_last(1.0)
         np.testing.assert_allclose(window, 0.7, atol=0.01)
 
-    def test_get_latest_window(self):
+    def test_get_last(self, ones_1s):
         """Test retrieving the latest audio window."""
         buf = AudioBuffer(sample_rate=16000, max_duration_sec=5.0)
         
         # Add 3 seconds of audio
         for i in range(3):
-            chunk = np.ones(16000, dtype=np.float32) * (i + 1) * 0.1
-            buf.add_chunk(chunk)
+            chunk = ones_1s * ((i + 1) * 0.1)
+            buf.append(chunk)
         
         # Get last 1 second
-        window = buf.get_latest_window(1.0)
+        window = buf.get_last(1.0)
         assert len(window) == 16000
         np.testing.assert_allclose(window, 0.3, atol=0.01)
         
         # Get last 2 seconds
-        window2 = buf.get_latest_window(2.0)
+        window2 = buf.get_last(2.0)
         assert len(window2) == 32000
 
-    def test_get_window_when_buffer_smaller(self):
+    def test_get_window_when_buffer_smaller(self, ones_1s):
         """Test that window returns available data when buffer is shorter than requested."""
         buf = AudioBuffer(sample_rate=16000, max_duration_sec=5.0)
-        chunk = np.ones(8000, dtype=np.float32) * 0.5  # 0.5 seconds
-        buf.add_chunk(chunk)
+        chunk = ones_1s[:8000] * 0.5  # 0.5 seconds
+        buf.append(chunk)
         
         # Request 2 seconds but only 0.5 is available
-        window = buf.get_latest_window(2.0)
+        window = buf.get_last(2.0)
         assert len(window) == 8000
 
-    def test_reset(self):
+    def test_reset(self, ones_1s):
         """Test buffer reset."""
         buf = AudioBuffer(sample_rate=16000, max_duration_sec=5.0)
-        buf.add_chunk(np.ones(1600, dtype=np.float32))
+        buf.append(ones_1s[:1600])
         buf.reset()
-        assert len(buf.buffer) == 0
-        assert buf.total_samples_processed == 0
+        assert buf.duration_available_sec == 0
+        assert buf.total_samples_written == 0
+        assert buf.get_last(1.0) is None
 
-    def test_total_samples_tracks_all(self):
-        """Test that total_samples_processed counts all samples, even evicted ones."""
+    def test_total_samples_tracks_all(self, ones_1s):
+        """Test that total_samples_written counts all samples, even evicted ones."""
         buf = AudioBuffer(sample_rate=16000, max_duration_sec=1.0)
         
         for _ in range(5):
-            buf.add_chunk(np.ones(16000, dtype=np.float32))
+            buf.append(ones_1s)
         
         # Buffer only keeps 16000, but total should be 80000
-        assert len(buf.buffer) == 16000
-        assert buf.total_samples_processed == 80000
+        assert buf.duration_available_sec == 1.0
+        assert buf.total_samples_written == 80000
+
+
+def _ramp(start: int, n: int) -> np.ndarray:
+    """Distinct int16 samples start, start+1, ... so ordering is checkable."""
+    return (np.arange(start, start + n) % 32768).astype(np.int16)
+
+
+class TestAudioBufferRing:
+    """Ring behaviour of the int16 store: wraparound, ghost tail, PCM16 I/O."""
+
+    def test_append_pcm16_roundtrip(self):
+        """PCM16 bytes are stored as-is and read back scaled by 1/32768."""
+        buf = AudioBuffer(sample_rate=1000, max_duration_sec=1.0)
+        pcm = _ramp(0, 500)
+        buf.append_pcm16(pcm.tobytes())
+        window = buf.get_last(1.0)
+        np.testing.assert_array_equal(window, pcm.astype(np.float32) / 32768.0)
+
+    def test_int16_quantization_tolerance(self):
+        """float32 input is quantized like f32_to_pcm16 (rounded, saturated), clipped to (-1, 1)."""
+        buf = AudioBuffer(sample_rate=1000, max_duration_sec=1.0)
+        rng = np.random.default_rng(0)
+        audio = rng.uniform(-1.0, 1.0, 800).astype(np.float32)
+        audio[:2] = [1.5, -1.5]
+        buf.append(audio)
+        window = buf.get_last(1.0)
+        expected = np.rint(np.clip(audio, -1.0, 1.0) * 32767).astype(np.int16)
+        np.testing.assert_array_equal(window * 32768, expected)
+        assert window.max() < 1.0 and window.min() > -1.0
+
+    def test_wraparound_matches_reference(self):
+        """Many odd-sized appends past capacity keep the last samples in order."""
+        buf = AudioBuffer(sample_rate=1000, max_duration_sec=1.0, window_sec=0.3)
+        rng = np.random.default_rng(1)
+        written = 0
+        for size in rng.integers(1, 400, 60):
+            buf.append_pcm16(_ramp(written, size).tobytes())
+            written += size
+            for sec in (0.2, 0.3, 1.0):  # ghost-tail reads and two-piece reads
+                n = min(int(sec * 1000), written)
+                out = np.empty(1000, dtype=np.int16)
+                np.testing.assert_array_equal(
+                    buf.get_last_pcm16_into(sec, out), _ramp(written - n, n)
+                )
+        assert buf.total_samples_written == written
+
+    @pytest.mark.parametrize("window_sec", [0.5, 0.2])  # ghost-tail read, two-piece read
+    def test_window_crossing_wrap_point(self, window_sec):
+        """A window straddling the physical end of the ring reads back contiguous."""
+        buf = AudioBuffer(sample_rate=1000, max_duration_sec=1.0, window_sec=window_sec)
+        size = buf._size  # physical ring length (power of two >= 1000)
+        buf.append_pcm16(_ramp(0, size - 100).tobytes())
+        buf.append_pcm16(_ramp(size - 100, 300).tobytes())  # wraps: 100 at the end, 200 at the start
+        window = buf.get_last(0.5)
+        np.testing.assert_array_equal(window * 32768, _ramp(size - 300, 500))
+
+    def test_chunk_larger_than_capacity(self):
+        """A chunk bigger than the ring keeps its newest samples, and later appends continue it."""
+        buf = AudioBuffer(sample_rate=1000, max_duration_sec=1.0)
+        buf.append_pcm16(_ramp(0, 3000).tobytes())
+        assert buf.total_samples_written == 3000
+        assert buf.duration_available_sec == 1.0
+        np.testing.assert_array_equal(buf.get_last(1.0) * 32768, _ramp(2000, 1000))
+        buf.append_pcm16(_ramp(3000, 250).tobytes())
+        np.testing.assert_array_equal(buf.get_last(1.0) * 32768, _ramp(2250, 1000))
+
+    def test_get_last_into_uses_caller_buffer(self):
+        """get_last_into fills (a prefix of) the caller's array and returns a view of it."""
+        buf = AudioBuffer(sample_rate=1000, max_duration_sec=1.0)
+        buf.append_pcm16(_ramp(0, 900).tobytes())
+        out = np.zeros(600, dtype=np.float32)
+        window = buf.get_last_into(1.0, out)
+        assert len(window) == 600  # capped at len(out)
+        assert np.shares_memory(window, out)
+        np.testing.assert_array_equal(window * 32768, _ramp(300, 600))
+
+    def test_reset_then_append(self):
+        """After reset, reads only see samples written since."""
+        buf = AudioBuffer(sample_rate=1000, max_duration_sec=1.0)
+        buf.append_pcm16(_ramp(0, 700).tobytes())
+        buf.reset()
+        assert buf.get_last(1.0) is None
+        buf.append_pcm16(_ramp(5000, 100).tobytes())
+        window = buf.get_last(1.0)
+        assert len(window) == 100
+        np.testing.assert_array_equal(window * 32768, _ramp(5000, 100))
 
 
 if __name__ == "__main__":
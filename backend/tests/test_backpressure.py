@@ -0,0 +1,60 @@
+"""Tests for BackpressureController (TTS degradation ladder)."""
+import pytest
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.app.core.backpressure import BackpressureController
+
+
+class TestBackpressureController:
+    def test_normal_below_queue_max(self):
+        """No degradation while pending TTS stays within queue_max."""
+        bp = BackpressureController(queue_max=2)
+        bp.on_tts_queued()
+        bp.on_tts_queued()
+        assert not bp.should_batch()
+        assert not bp.should_skip_tts()
+
+    def test_batch_above_queue_max(self):
+        """Exceeding queue_max switches to batch mode only."""
+        bp = BackpressureController(queue_max=2)
+        for _ in range(3):
+            bp.on_tts_queued()
+        assert bp.should_batch()
+        assert not bp.should_skip_tts()
+
+    def test_skip_above_twice_queue_max(self):
+        """Exceeding 2*queue_max must enter skip mode (and keep batching)."""
+        bp = BackpressureController(queue_max=2)
+        for _ in range(5):
+            bp.on_tts_queued()
+        assert bp.should_skip_tts()
+        assert bp.should_batch()
+
+    def test_recovers_when_queue_drains(self):
+        """Levels step back down as TTS jobs complete."""
+        bp = BackpressureController(queue_max=2)
+        for _ in range(5):
+            bp.on_tts_queued()
+        bp.on_tts_completed()
+        bp.on_tts_completed()
+        assert bp.should_batch()
+        assert not bp.should_skip_tts()
+        bp.on_tts_completed()
+        assert not bp.should_batch()
+        assert bp.pending_count == 2
+
+    def test_flush_batch(self):
+        """Batched text is merged in order and the buffer is cleared."""
+        bp = BackpressureController()
+        assert bp.flush_batch() is None
+        bp.add_to_batch("hola")
+        bp.add_to_batch("mundo")
+        assert bp.flush_batch() == "hola mundo"
+        assert bp.flush_batch() is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
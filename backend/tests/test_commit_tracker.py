@@ -6,7 +6,7 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
-from backend.app.core.commit_tracker import CommitTracker, CommitEvent
+from backend.app.core.commit_tracker import CommitTracker, CommitEvent, _MAX_WORD_IDS
 
 
 class TestCommitTracker:
@@ -191,6 +191,25 @@ class TestCommitTracker:
         assert len(events) == 1
         assert events[0].text == "some unstable text"
 
+    def test_word_ids_bounded(self):
+        """The word id map must not grow with the session's vocabulary."""
+        tracker = CommitTracker(stability_k=2, timeout_sec=100.0, min_words=3)
+        for i in range(5000):
+            tracker.update(f"palabra{i} nueva{i}")  # never stable, never committed
+        # The cap is checked before a hypothesis is added, so it can overshoot
+        # by at most that hypothesis' two words.
+        assert len(tracker._word_ids) <= _MAX_WORD_IDS + 2
+
+    def test_stability_survives_commit_reindex(self):
+        """Uncommitted words keep their stability after a commit rebuilds the id map."""
+        tracker = CommitTracker(stability_k=2, timeout_sec=100.0, min_words=2)
+        tracker.update("uno dos")
+        events = tracker.update("uno dos tres cuatro")
+        assert [e.text for e in events] == ["uno dos"]
+        tracker.update("uno dos tres cuatro")
+        events = tracker.update("uno dos tres cuatro")
+        assert [e.text for e in events] == ["tres cuatro"]
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -1,12 +1,15 @@
 """Tests for output assembly (PCM16 conversion, base64 encoding)."""
 import numpy as np
-import base64
+import binascii
 import pytest
 import sys
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
+from backend.app.core.b64 import b64decode, b64encode
+from backend.app.pipeline.pcm import f32_to_pcm16
+
 
 class TestPCM16Conversion:
     def test_float32_to_pcm16_roundtrip(self):
@@ -14,39 +17,46 @@ class TestPCM16Conversion:
         # Create known float32 audio
         original = np.array([0.0, 0.5, -0.5, 1.0, -1.0], dtype=np.float32)
         
-        # Convert to PCM16 bytes
-        pcm16 = (original * 32767).astype(np.int16)
+        # Convert to PCM16 bytes: int16(rint(x * 32767)), ties to even
+        pcm16 = np.empty(len(original), dtype=np.int16)
+        f32_to_pcm16(original, pcm16)
+        expected_pcm16 = np.array([0, 16384, -16384, 32767, -32767], dtype=np.int16)
+        np.testing.assert_array_equal(pcm16, expected_pcm16)
         pcm16_bytes = pcm16.tobytes()
         
-        # Convert back
+        # Convert back: exactly the quantized values over 32768
         recovered = np.frombuffer(pcm16_bytes, dtype=np.int16).astype(np.float32) / 32768.0
-        
-        # Should be close (quantization error)
-        np.testing.assert_allclose(original, recovered, atol=1.0 / 32768.0)
+        np.testing.assert_array_equal(recovered, expected_pcm16.astype(np.float32) / 32768.0)
 
     def test_pcm16_base64_roundtrip(self):
         """Test PCM16 → base64 → PCM16 roundtrip (matching frontend encoding)."""
         # Simulate what the frontend does
         original_pcm16 = np.array([0, 16383, -16384, 32767, -32768], dtype=np.int16)
-        pcm16_bytes = original_pcm16.tobytes()
         
-        # Encode to base64 (what frontend sends)
-        b64_encoded = base64.b64encode(pcm16_bytes).decode('ascii')
+        # Encode to base64 (what frontend sends), straight from the array buffer
+        b64_encoded = b64encode(memoryview(original_pcm16))
+        assert b64_encoded == b64encode(original_pcm16.tobytes())
         
         # Decode on backend side
-        decoded_bytes = base64.b64decode(b64_encoded)
+        decoded_bytes = b64decode(b64_encoded)
         recovered_pcm16 = np.frombuffer(decoded_bytes, dtype=np.int16)
         
         np.testing.assert_array_equal(original_pcm16, recovered_pcm16)
 
+    def test_base64_decode_rejects_invalid(self):
+        """Test that corrupt base64 raises instead of yielding shifted PCM."""
+        b64_encoded = b64encode(np.arange(8, dtype=np.int16).tobytes())
+        with pytest.raises(binascii.Error):
+            b64decode("!" + b64_encoded[1:])
+
     def test_pcm16_clamping(self):
         """Test that values are properly clamped to int16 range."""
         # Values that exceed float32 [-1, 1] range
         float_audio = np.array([1.5, -1.5, 2.0, -2.0], dtype=np.float32)
         
-        # Clamp first, then convert
-        clamped = np.clip(float_audio, -1.0, 1.0)
-        pcm16 = (clamped * 32767).astype(np.int16)
+        # Clamped during conversion
+        pcm16 = np.empty(len(float_audio), dtype=np.int16)
+        f32_to_pcm16(float_audio, pcm16)
         
         assert pcm16[0] == 32767  # Clamped to max
         assert pcm16[1] == -32767  # Clamped to min
@@ -60,15 +70,14 @@ class TestPCM16Conversion:
 
     def test_chunk_assembly_no_gaps(self):
         """Test that consecutive audio chunks assemble without gaps."""
-        chunks = []
-        for i in range(5):
-            # Each chunk is 100ms at 24kHz = 2400 samples
-            t = np.arange(i * 2400, (i + 1) * 2400, dtype=np.float32) / 24000
-            chunk = np.sin(2 * np.pi * 440 * t).astype(np.float32)
-            chunks.append(chunk)
+        # 5 chunks of 100ms at 24kHz = 2400 samples, cut from one sine
+        t = np.arange(5 * 2400, dtype=np.float32) / np.float32(24000)
+        full = np.sin(np.float32(2 * np.pi * 440) * t, dtype=np.float32)
+        chunks = list(full.reshape(5, 2400))
         
         # Assemble
         assembled = np.concatenate(chunks)
+        np.testing.assert_array_equal(assembled, full)
         
         # Check continuity at boundaries
         for i in range(len(chunks) - 1):
@@ -8,7 +8,7 @@ import { LanguageSelector } from './components/LanguageSelector';
 import { LatencyIndicator } from './components/LatencyIndicator';
 import { StatusBar } from './components/StatusBar';
 import { TranscriptPanel } from './components/TranscriptPanel';
-import { base64ToPcm16 } from './utils/audioUtils';
+import { decodeAudioFrame, encodeAudioFrame } from './utils/audioUtils';
 import { useAudioCapture } from './hooks/useAudioCapture';
 import { useAudioPlayback } from './hooks/useAudioPlayback';
 import { useWebSocket } from './hooks/useWebSocket';
@@ -53,25 +53,8 @@ function App() {
         setPartialTranslation('');
         break;
 
-      case 'tts_audio_chunk': {
-        // Backend sends audio as base64 JSON: { audio_b64: "...", sample_rate: 24000 }
-        if (event.audio_b64) {
-          try {
-            const pcm16Buffer = base64ToPcm16(event.audio_b64);
-            enqueueAudio(pcm16Buffer);
-          } catch (e) {
-            console.error('[TTS] Failed to decode audio chunk:', e);
-          }
-        }
-        break;
-      }
-
-      case 'tts_end':
-        // TTS finished for a segment — nothing special needed
-        break;
-
       case 'stats':
-        // Backend sends: asr_ms, mt_ms, tts_ms, e2e_ms
+        // Sent once per segment after its TTS audio: asr_ms, mt_ms, tts_ms, e2e_ms
         setLatencyStats({
           asr: event.asr_ms,
           mt: event.mt_ms,
@@ -92,18 +75,21 @@ function App() {
         setStatusMessage(`Error: ${event.message}`);
         break;
     }
-  }, [enqueueAudio]);
+  }, []);
 
   const handleBinaryMessage = useCallback((data: ArrayBuffer) => {
-    // Binary messages are TTS audio chunks (PCM16) — fallback path
-    enqueueAudio(data);
+    // Binary messages are TTS audio frames (header + PCM16 @ 24kHz)
+    const frame = decodeAudioFrame(data);
+    if (frame) {
+      enqueueAudio(frame.pcm16);
+    }
   }, [enqueueAudio]);
 
   const handleStatusChange = useCallback((status: ConnectionStatus) => {
     setConnectionStatus(status);
   }, []);
 
-  const { connect, disconnect, sendJSON, isConnected } = useWebSocket({
+  const { connect, disconnect, sendJSON, sendBinary, isConnected } = useWebSocket({
     url: WS_URL,
     onTextMessage: handleTextMessage,
     onBinaryMessage: handleBinaryMessage,
@@ -111,14 +97,9 @@ function App() {
   });
 
   // ── Audio Capture ──
-  const handleAudioChunk = useCallback((pcm16Base64: string, seq: number) => {
-    sendJSON({
-      type: 'audio',
-      seq,
-      sample_rate: 16000,
-      pcm16_base64: pcm16Base64,
-    });
-  }, [sendJSON]);
+  const handleAudioChunk = useCallback((pcm16: ArrayBuffer, seq: number) => {
+    sendBinary(encodeAudioFrame(pcm16, seq));
+  }, [sendBinary]);
 
   const { isCapturing, error: audioError, start: startCapture, stop: stopCapture } = useAudioCapture({
     targetSampleRate: 16000,
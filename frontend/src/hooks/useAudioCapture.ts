@@ -1,10 +1,9 @@
 import { useCallback, useRef, useState } from 'react';
-import { pcm16ToBase64 } from '../utils/audioUtils';
 
 interface UseAudioCaptureOptions {
   targetSampleRate?: number;
   chunkMs?: number;
-  onAudioChunk: (pcm16Base64: string, seq: number) => void;
+  onAudioChunk: (pcm16: ArrayBuffer, seq: number) => void;
 }
 
 export function useAudioCapture({
@@ -55,9 +54,8 @@ export function useAudioCapture({
 
       workletNode.port.onmessage = (event: MessageEvent) => {
         if (event.data.type === 'audio') {
-          const base64 = pcm16ToBase64(event.data.pcm16);
           seqRef.current++;
-          onAudioChunk(base64, seqRef.current);
+          onAudioChunk(event.data.pcm16, seqRef.current);
         }
       };
 
@@ -39,20 +39,13 @@ export interface TranslationCommittedEvent {
   segment_id: number;
 }
 
-export interface TTSAudioChunkEvent {
-  type: 'tts_audio_chunk';
-  audio_b64: string;
-  segment_id: number;
-  sample_rate: number;
-}
-
-export interface TTSEndEvent {
-  type: 'tts_end';
-  segment_id: number;
-}
+// TTS audio arrives as binary WS frames (raw PCM16), not as JSON events.
 
 export interface StatsEvent {
   type: 'stats';
+  segment_id: number;
+  tts_chunks: number;
+  tts_truncated: boolean;  // rest of the segment's audio dropped (client too slow)
   asr_ms: number;
   mt_ms: number;
   tts_ms: number;
@@ -79,8 +72,6 @@ export type ServerEvent =
   | PartialTranscriptEvent
   | CommittedTranscriptEvent
   | TranslationCommittedEvent
-  | TTSAudioChunkEvent
-  | TTSEndEvent
   | StatsEvent
   | ReadyEvent
   | StatusEvent
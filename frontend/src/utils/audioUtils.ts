@@ -1,25 +1,27 @@
+/** Binary WS audio frame: 1-byte type tag + uint32 LE (seq / segment_id) + PCM16. */
+export const BINARY_AUDIO = 0x01;
+export const AUDIO_FRAME_HEADER_BYTES = 5;
+
 /**
- * Convert an ArrayBuffer of PCM16 (Int16Array) to base64 string.
+ * Wrap a PCM16 chunk in a binary audio frame.
  */
-export function pcm16ToBase64(pcm16Buffer: ArrayBuffer): string {
-  const bytes = new Uint8Array(pcm16Buffer);
-  let binary = '';
-  for (let i = 0; i < bytes.length; i++) {
-    binary += String.fromCharCode(bytes[i]);
-  }
-  return btoa(binary);
+export function encodeAudioFrame(pcm16Buffer: ArrayBuffer, id: number): ArrayBuffer {
+  const frame = new Uint8Array(AUDIO_FRAME_HEADER_BYTES + pcm16Buffer.byteLength);
+  const view = new DataView(frame.buffer);
+  view.setUint8(0, BINARY_AUDIO);
+  view.setUint32(1, id >>> 0, true);
+  frame.set(new Uint8Array(pcm16Buffer), AUDIO_FRAME_HEADER_BYTES);
+  return frame.buffer;
 }
 
 /**
- * Convert a base64 string back to an ArrayBuffer of PCM16.
+ * Extract the PCM16 payload of a binary audio frame, or null if it is not one.
  */
-export function base64ToPcm16(base64: string): ArrayBuffer {
-  const binary = atob(base64);
-  const bytes = new Uint8Array(binary.length);
-  for (let i = 0; i < binary.length; i++) {
-    bytes[i] = binary.charCodeAt(i);
-  }
-  return bytes.buffer;
+export function decodeAudioFrame(frame: ArrayBuffer): { id: number; pcm16: ArrayBuffer } | null {
+  if (frame.byteLength <= AUDIO_FRAME_HEADER_BYTES) return null;
+  const view = new DataView(frame);
+  if (view.getUint8(0) !== BINARY_AUDIO) return null;
+  return { id: view.getUint32(1, true), pcm16: frame.slice(AUDIO_FRAME_HEADER_BYTES) };
 }
 
 /**
@@ -8,19 +8,33 @@ Usage:
 """
 
 import argparse
+import importlib.util
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor, wait
 from pathlib import Path
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+# Multi-connection downloads via the Rust hf_transfer backend.  Must be set
+# before huggingface_hub is imported, and only when the package is present
+# (huggingface_hub errors out if it is enabled but missing).
+if importlib.util.find_spec("hf_transfer") is not None:
+    os.environ.setdefault("HF_HUB_ENABLE_HF_TRANSFER", "1")
 
-def download_asr_model(model_name: str):
-    """Download Qwen3-ASR model (via from_pretrained, which caches to HF_HOME/transformers)."""
-    print(f"\n{'='*60}")
-    print(f"📥 Downloading ASR model: {model_name}")
-    print(f"{'='*60}")
+
+def _header(title: str) -> list[str]:
+    return [f"\n{'='*60}", title, f"{'='*60}"]
+
+
+def download_asr_model(model_name: str) -> list[str]:
+    """Download Qwen3-ASR model (via from_pretrained, which caches to HF_HOME/transformers).
+
+    Returns the report lines; they are printed by main() once every download
+    has finished, so concurrent downloads do not interleave their output.
+    """
+    lines = _header(f"📥 Downloading ASR model: {model_name}")
     try:
         import torch
         from qwen_asr import Qwen3ASRModel
@@ -33,41 +47,53 @@ def download_asr_model(model_name: str):
             max_inference_batch_size=32,
             max_new_tokens=256,
         )
-        print(f"✅ ASR model '{model_name}' downloaded successfully.")
+        lines.append(f"✅ ASR model '{model_name}' downloaded successfully.")
         del model
     except Exception as e:
-        print(f"❌ Failed to download ASR model: {e}")
+        lines.append(f"❌ Failed to download ASR model: {e}")
+    return lines
 
 
-def download_mt_model(model_name: str, cache_dir: str):
-    """Download MarianMT model and tokenizer."""
-    print(f"\n{'='*60}")
-    print(f"📥 Downloading MT model: {model_name}")
-    print(f"{'='*60}")
+def download_mt_model(model_name: str, cache_dir: str) -> list[str]:
+    """Download MarianMT model and tokenizer. Returns the report lines."""
+    lines = _header(f"📥 Downloading MT model: {model_name}")
     try:
+        import torch
         from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
         tokenizer = AutoTokenizer.from_pretrained(model_name, cache_dir=cache_dir)
-        model = AutoModelForSeq2SeqLM.from_pretrained(model_name, cache_dir=cache_dir)
-        print(f"✅ MT model '{model_name}' downloaded successfully.")
+        model = AutoModelForSeq2SeqLM.from_pretrained(
+            model_name,
+            cache_dir=cache_dir,
+            torch_dtype=torch.float16 if torch.cuda.is_available() else torch.float32,
+            low_cpu_mem_usage=True,
+        )
+        lines.append(f"✅ MT model '{model_name}' downloaded successfully.")
         del tokenizer, model
     except Exception as e:
-        print(f"❌ Failed to download MT model: {e}")
+        lines.append(f"❌ Failed to download MT model: {e}")
+    return lines
 
 
-def download_tts_model(model_name: str, cache_dir: str):
-    """Download TTS model (placeholder for Qwen3-TTS)."""
-    print(f"\n{'='*60}")
-    print(f"📥 TTS model: {model_name}")
-    print(f"{'='*60}")
+def download_tts_model(model_name: str, cache_dir: str) -> list[str]:
+    """Download TTS model (placeholder for Qwen3-TTS). Returns the report lines."""
+    lines = _header(f"📥 TTS model: {model_name}")
     try:
+        import torch
         from transformers import AutoModelForCausalLM, AutoTokenizer
         tokenizer = AutoTokenizer.from_pretrained(model_name, cache_dir=cache_dir, trust_remote_code=True)
-        model = AutoModelForCausalLM.from_pretrained(model_name, cache_dir=cache_dir, trust_remote_code=True)
-        print(f"✅ TTS model '{model_name}' downloaded successfully.")
+        model = AutoModelForCausalLM.from_pretrained(
+            model_name,
+            cache_dir=cache_dir,
+            trust_remote_code=True,
+            torch_dtype=torch.float16 if torch.cuda.is_available() else torch.float32,
+            low_cpu_mem_usage=True,
+        )
+        lines.append(f"✅ TTS model '{model_name}' downloaded successfully.")
         del tokenizer, model
     except Exception as e:
-        print(f"⚠️  TTS model download skipped (using mock): {e}")
-        print("   The TTS pipeline will use mock audio generation until Qwen3-TTS is available.")
+        lines.append(f"⚠️  TTS model download skipped (using mock): {e}")
+        lines.append("   The TTS pipeline will use mock audio generation until Qwen3-TTS is available.")
+    return lines
 
 
 def main():
@@ -84,9 +110,19 @@ def main():
     print(f"🗂️  Model cache directory (MT/TTS): {os.path.abspath(cache_dir)}")
     print("   (Qwen3-ASR uses HuggingFace cache by default)")
 
-    download_asr_model(args.asr_model)
-    download_mt_model(args.mt_model, cache_dir)
-    download_tts_model(args.tts_model, cache_dir)
+    # Downloads are network-bound: run them concurrently so the total is
+    # roughly the slowest model rather than the sum.  Each returns its report,
+    # printed per model in a fixed order once all of them have finished.
+    print(f"\n📥 Downloading {args.asr_model}, {args.mt_model}, {args.tts_model} ...")
+    with ThreadPoolExecutor(max_workers=3) as ex:
+        futures = [
+            ex.submit(download_asr_model, args.asr_model),
+            ex.submit(download_mt_model, args.mt_model, cache_dir),
+            ex.submit(download_tts_model, args.tts_model, cache_dir),
+        ]
+        wait(futures)
+    for future in futures:
+        print("\n".join(future.result()))
 
     print(f"\n{'='*60}")
     print("🎉 Model download complete!")
@@ -39,8 +39,20 @@ def main():
     # ── Python packages ──
     print(f"\n📦 Python Packages:")
     
+    # torch is imported once here and reused below (its import and CUDA
+    # probe are the slowest part of the script)
+    try:
+        import torch
+    except ImportError:
+        torch = None
+
+    def torch_version():
+        if torch is None:
+            raise ImportError("No module named 'torch'")
+        return torch.__version__
+
     check("numpy", lambda: __import__("numpy").__version__)
-    check("torch", lambda: __import__("torch").__version__)
+    check("torch", torch_version)
     check("transformers", lambda: __import__("transformers").__version__)
     check("qwen_asr", lambda: __import__("qwen_asr").__version__ if hasattr(__import__("qwen_asr"), "__version__") else "installed")
     check("fastapi", lambda: __import__("fastapi").__version__)
@@ -51,28 +63,34 @@ def main():
 
     # ── Device ──
     print(f"\n🖥️  Device:")
-    import torch
-    check("CUDA available", lambda: f"{torch.cuda.is_available()}" + (f" ({torch.cuda.get_device_name(0)})" if torch.cuda.is_available() else ""))
-    check("MPS available", lambda: f"{torch.backends.mps.is_available()}" if hasattr(torch.backends, "mps") else "N/A")
+    if torch is None:
+        print("  (skipped — torch not installed)")
+    else:
+        cuda = torch.cuda.is_available()
+        check("CUDA available", lambda: f"{cuda}" + (f" ({torch.cuda.get_device_name(0)})" if cuda else ""))
+        check("MPS available", lambda: f"{torch.backends.mps.is_available()}" if hasattr(torch.backends, "mps") else "N/A")
     
     # ── Config ──
     print(f"\n⚙️  Config:")
     try:
         from backend.app import config as app_config
+    except Exception as e:
+        app_config = None
+        print(f"  ⚠️  Could not load config: {e}")
+    if app_config is not None:
         check("Device", lambda: app_config.DEVICE)
         check("ASR model", lambda: app_config.ASR_MODEL)
         check("MT models", lambda: list(app_config.MT_MODELS.keys()))
         check("TTS engine", lambda: app_config.TTS_ENGINE)
         check("Sample rate", lambda: f"{app_config.CAPTURE_SAMPLE_RATE} Hz")
         check("Model cache dir", lambda: str(app_config.MODEL_CACHE_DIR))
-    except Exception as e:
-        print(f"  ⚠️  Could not load config: {e}")
 
     # ── Model files ──
     print(f"\n📁 Model Cache:")
     try:
-        from backend.app.config import MODEL_CACHE_DIR
-        cache_dir = Path(MODEL_CACHE_DIR)
+        if app_config is None:
+            raise RuntimeError("config not loaded")
+        cache_dir = Path(app_config.MODEL_CACHE_DIR)
         if cache_dir.exists():
             items = list(cache_dir.iterdir())
             if items:
@@ -3,7 +3,7 @@
 Test the full pipeline with a .wav file and measure per-stage latencies.
 
 Usage:
-    python scripts/test_wav_pipeline.py --input test_audio.wav [--src-lang es] [--tgt-lang en]
+    python scripts/test_wav_pipeline.py --input test_audio.wav [--src-lang es] [--tgt-lang en] [--no-speculative-mt]
 
 If no input file is provided, generates a synthetic sine wave for testing.
 """
@@ -21,22 +21,121 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 # Set environment before importing config
 os.environ.setdefault("DEVICE", "cpu")
 
+# Frames decoded per read when downmixing multichannel WAVs
+_WAV_BLOCK_FRAMES = 65536
 
-async def test_pipeline(input_file: str, src_lang: str, tgt_lang: str):
-    from backend.app.pipeline.asr import ASREngine
-    from backend.app.pipeline.mt import MTEngine
-    from backend.app.pipeline.tts import TTSEngine
+
+def _read_wav_float32(path: str) -> tuple[np.ndarray, int]:
+    """Read a WAV file as mono float32 in [-1, 1]; returns (audio, sample_rate)."""
+    try:
+        import soundfile as sf
+    except ImportError:
+        sf = None
+    if sf is not None:
+        # libsndfile decodes straight into a normalized float32 buffer
+        with sf.SoundFile(path) as f:
+            sample_rate = f.samplerate
+            if f.channels == 1:
+                return f.read(dtype="float32"), sample_rate
+            # Downmix block by block into the mono result, so the full
+            # multichannel signal is never held in memory
+            audio = np.empty(f.frames, dtype=np.float32)
+            block = np.empty((_WAV_BLOCK_FRAMES, f.channels), dtype=np.float32)
+            pos = 0
+            while True:
+                frames = f.read(out=block)
+                n = len(frames)
+                if n == 0:
+                    break
+                np.mean(frames, axis=1, out=audio[pos : pos + n])
+                pos += n
+            return audio[:pos], sample_rate
+
+    from scipy.io import wavfile
+    try:
+        # Map the PCM payload instead of reading it into memory: the
+        # conversion below is then the only pass over the samples
+        sample_rate, audio_data = wavfile.read(path, mmap=True)
+    except ValueError:
+        # Formats scipy can't map (e.g. 24-bit PCM)
+        sample_rate, audio_data = wavfile.read(path)
+    # float32 reciprocal scales: multiplying by one keeps every pass in
+    # float32 (dividing by a Python float would promote to float64)
+    offset = 0
+    if audio_data.dtype.kind == "f":
+        scale = np.float32(1.0)
+    elif audio_data.dtype.kind == "u":
+        # 8-bit WAV is unsigned, centred on 128
+        offset = 128
+        scale = np.float32(1.0 / 128.0)
+    else:
+        # int16 → 1/32768; 24/32-bit are left-justified int32 → 1/2**31
+        scale = np.float32(1.0 / (np.iinfo(audio_data.dtype).max + 1))
+    if audio_data.ndim > 1:
+        # Downmix and cast in one reduction, then scale the mono signal
+        channels = audio_data.shape[1]
+        audio_float = np.add.reduce(audio_data, axis=1, dtype=np.float32)
+        if offset:
+            audio_float -= np.float32(offset * channels)
+        audio_float *= scale / np.float32(channels)
+    elif audio_data.dtype.kind == "f":
+        # Always copy: a float32 file would otherwise stay a file-backed map
+        audio_float = np.array(audio_data, dtype=np.float32)
+    elif offset:
+        audio_float = np.subtract(audio_data, np.float32(offset), dtype=np.float32)
+        audio_float *= scale
+    else:
+        # Cast and scale in one pass, no intermediate float32 copy
+        audio_float = np.multiply(audio_data, scale, dtype=np.float32)
+    return audio_float, sample_rate
+
+
+def _resample_float32(audio: np.ndarray, sr_in: int, sr_out: int) -> np.ndarray:
+    """Resample mono float32 audio from sr_in to sr_out."""
+    try:
+        import soxr
+    except ImportError:
+        soxr = None
+    if soxr is not None:
+        # libsoxr polyphase resampler, float32 in and out
+        return soxr.resample(audio, sr_in, sr_out, quality="HQ")
+
+    # Polyphase FIR (e.g. 48k → 16k is up=1, down=3) instead of an FFT over
+    # the whole file
+    from fractions import Fraction
+    from scipy.signal import resample_poly
+    ratio = Fraction(sr_out, sr_in).limit_denominator(1000)
+    return resample_poly(audio, ratio.numerator, ratio.denominator).astype(
+        np.float32, copy=False
+    )
+
+
+async def test_pipeline(input_file: str, src_lang: str, tgt_lang: str, speculative_mt: bool = True):
+    from backend.app.pipeline.asr import get_asr_engine, _compute_rms
+    from backend.app.pipeline.orchestrator import _SILENCE_RMS_THRESHOLD
+    from backend.app.pipeline.mt import get_mt_engine
+    from backend.app.pipeline.tts import get_tts_engine
     from backend.app.core.commit_tracker import CommitTracker
     from backend.app.config import (
         ASR_MODEL,
         ASR_MAX_NEW_TOKENS,
         ASR_MAX_BATCH_SIZE,
+        ASR_COMPUTE_TYPE,
         WINDOW_SEC,
         ASR_INTERVAL_MS,
         COMMIT_STABILITY_K,
         COMMIT_TIMEOUT_SEC,
         COMMIT_MIN_WORDS,
         CAPTURE_SAMPLE_RATE,
+        MT_BACKEND,
+        MT_BEAM_SIZE,
+        MT_COMPUTE_TYPE,
+        MT_MAX_BATCH_SIZE,
+        MODEL_CACHE_DIR,
+        TTS_ENGINE,
+        TTS_QWEN3_MODEL,
+        TTS_COMPUTE_TYPE,
+        TTS_SAMPLE_RATE,
     )
     from backend.app.core.audio_buffer import AudioBuffer
 
@@ -44,22 +143,10 @@ async def test_pipeline(input_file: str, src_lang: str, tgt_lang: str):
     if input_file and os.path.exists(input_file):
         print(f"\n📂 Loading audio file: {input_file}")
         try:
-            from scipy.io import wavfile
-            sample_rate, audio_data = wavfile.read(input_file)
-            if audio_data.dtype == np.int16:
-                audio_float = audio_data.astype(np.float32) / 32768.0
-            elif audio_data.dtype == np.float32:
-                audio_float = audio_data
-            else:
-                audio_float = audio_data.astype(np.float32) / np.iinfo(audio_data.dtype).max
-            if len(audio_float.shape) > 1:
-                audio_float = audio_float.mean(axis=1)
+            audio_float, sample_rate = _read_wav_float32(input_file)
             if sample_rate != 16000:
-                from scipy.signal import resample
-                num_samples = int(len(audio_float) * 16000 / sample_rate)
-                audio_float = resample(audio_float, num_samples).astype(np.float32)
+                audio_float = _resample_float32(audio_float, sample_rate, 16000)
                 sample_rate = 16000
-            print(f"  Duration: {len(audio_float)/sample_rate:.2f}s, Samples: {len(audio_float)}")
         except Exception as e:
             print(f"❌ Failed to load audio file: {e}")
             return
@@ -67,36 +154,70 @@ async def test_pipeline(input_file: str, src_lang: str, tgt_lang: str):
         print("\n🔊 Generating synthetic test audio (2s sine wave)...")
         sample_rate = CAPTURE_SAMPLE_RATE
         duration = 2.0
-        t = np.linspace(0, duration, int(sample_rate * duration), dtype=np.float32)
-        audio_float = 0.3 * np.sin(2 * np.pi * 440 * t)
-        print(f"  Duration: {duration}s, Samples: {len(audio_float)}")
+        n = int(sample_rate * duration)
+        # Phase, sin and gain computed in place in one float32 buffer
+        audio_float = np.empty(n, dtype=np.float32)
+        np.multiply(
+            np.arange(n, dtype=np.float32),
+            np.float32(2 * np.pi * 440 / sample_rate),
+            out=audio_float,
+        )
+        np.sin(audio_float, out=audio_float)
+        audio_float *= np.float32(0.3)
+
+    n_samples = len(audio_float)
+    duration_sec = n_samples / sample_rate
+    print(f"  Duration: {duration_sec:.2f}s, Samples: {n_samples}")
 
     # ── Initialize engines ──
     print("\n⏳ Loading models...")
     device = "cuda" if __import__("torch").cuda.is_available() else "cpu"
 
+    def timed(load):
+        def run():
+            t0 = time.perf_counter()
+            return load(), time.perf_counter() - t0
+        return asyncio.to_thread(run)
+
+    def load_mt():
+        engine = get_mt_engine(
+            device=device,
+            backend=MT_BACKEND,
+            cache_dir=MODEL_CACHE_DIR,
+            beam_size=MT_BEAM_SIZE,
+            compute_type=MT_COMPUTE_TYPE,
+            max_batch_size=MT_MAX_BATCH_SIZE,
+        )
+        engine.load_pair(src_lang, tgt_lang)
+        return engine
+
+    # Same configuration as the server (backend/app/main.py).  Engines are
+    # cached per configuration, so repeated runs in one process reuse the
+    # loaded weights.  The three loads are independent and run in
+    # parallel threads, so the total is about the slowest one.
     t0 = time.perf_counter()
-    asr_engine = ASREngine(
-        model_name=ASR_MODEL,
-        device=device,
-        max_new_tokens=ASR_MAX_NEW_TOKENS,
-        max_inference_batch_size=ASR_MAX_BATCH_SIZE,
+    (asr_engine, t_asr_load), (mt_engine, t_mt_load), (tts_engine, t_tts_load) = await asyncio.gather(
+        timed(lambda: get_asr_engine(
+            model_name=ASR_MODEL,
+            device=device,
+            max_new_tokens=ASR_MAX_NEW_TOKENS,
+            max_inference_batch_size=ASR_MAX_BATCH_SIZE,
+            compute_type=ASR_COMPUTE_TYPE,
+        )),
+        timed(load_mt),
+        timed(lambda: get_tts_engine(
+            backend=TTS_ENGINE,
+            qwen3_model=TTS_QWEN3_MODEL,
+            device=device,
+            output_sample_rate=TTS_SAMPLE_RATE,
+            compute_type=TTS_COMPUTE_TYPE,
+        )),
     )
-    asr_engine.load()
-    t_asr_load = time.perf_counter() - t0
+    t_load = time.perf_counter() - t0
     print(f"  ASR loaded in {t_asr_load:.2f}s")
-
-    t0 = time.perf_counter()
-    mt_engine = MTEngine(device=device)
-    mt_engine.load_pair(src_lang, tgt_lang)
-    t_mt_load = time.perf_counter() - t0
     print(f"  MT loaded in {t_mt_load:.2f}s")
-
-    t0 = time.perf_counter()
-    tts_engine = TTSEngine(backend=os.getenv("TTS_ENGINE", "edge-tts"), qwen3_model=os.getenv("TTS_QWEN3_MODEL", "Qwen/Qwen3-TTS-0.6B"), device=device, output_sample_rate=int(os.getenv("TTS_SAMPLE_RATE", "24000")))
-    tts_engine.load()
-    t_tts_load = time.perf_counter() - t0
     print(f"  TTS loaded in {t_tts_load:.2f}s")
+    print(f"  All models loaded in {t_load:.2f}s (in parallel)")
 
     # ── Simulate streaming: buffer + ASR on sliding window ──
     print(f"\n🎙️  Simulating streaming pipeline ({src_lang} → {tgt_lang})...")
@@ -113,81 +234,185 @@ async def test_pipeline(input_file: str, src_lang: str, tgt_lang: str):
     chunk_size = int(sample_rate * chunk_ms / 1000)
     interval_sec = ASR_INTERVAL_MS / 1000.0
     chunks_per_interval = max(1, int(interval_sec * sample_rate / chunk_size))
-    total_chunks = len(audio_float) // chunk_size
+    total_chunks = n_samples // chunk_size
 
     asr_timings = []
+    silent_windows = 0
     mt_timings = []
     tts_timings = []
     e2e_timings = []
     committed_texts = []
     translated_texts = []
-    tts_audio_chunks = []
+    # TTS output is only counted, not kept
+    tts_chunk_total = 0
+    tts_audio_bytes = 0
 
-    for i in range(total_chunks):
-        chunk = audio_float[i * chunk_size : (i + 1) * chunk_size]
-        audio_buffer.append(chunk)
+    # ── MT and TTS run as queue-fed stages, so translating/synthesizing one
+    #    segment overlaps ASR on the following windows.  Each stage takes
+    #    whatever has queued up and runs it concurrently (the engines batch
+    #    concurrent requests).  None marks the end of input.
+    max_stage_batch = MT_MAX_BATCH_SIZE
+    mt_queue: asyncio.Queue = asyncio.Queue()
+    tts_queue: asyncio.Queue = asyncio.Queue()
 
-        if (i + 1) % chunks_per_interval == 0:
-            chunk_start_time = time.perf_counter()
-            audio_window = audio_buffer.get_last(WINDOW_SEC)
-            if audio_window is None or len(audio_window) < sample_rate * 0.5:
-                continue
+    async def take_batch(queue: asyncio.Queue) -> list:
+        items = [await queue.get()]
+        while items[-1] is not None and len(items) < max_stage_batch and not queue.empty():
+            items.append(queue.get_nowait())
+        return items
 
-            t0 = time.perf_counter()
-            hypothesis = await asr_engine.transcribe(audio_window, language=src_lang)
-            t_asr = (time.perf_counter() - t0) * 1000
-            asr_timings.append(t_asr)
-
-            if hypothesis:
-                commit_events = commit_tracker.update(hypothesis)
-                for ev in commit_events:
-                    committed_texts.append(ev.text)
-                    print(f"\n  📝 Committed: \"{ev.text}\"  (ASR: {t_asr:.0f}ms)")
-
-                    t0 = time.perf_counter()
-                    translation = await mt_engine.translate(ev.text, src_lang, tgt_lang)
-                    t_mt = (time.perf_counter() - t0) * 1000
+    async def synthesize_one(translation: str, start: float) -> None:
+        nonlocal tts_chunk_total, tts_audio_bytes
+        t0 = time.perf_counter()
+        chunk_count = 0
+        async for tts_chunk in tts_engine.synthesize_streaming(translation, lang=tgt_lang):
+            chunk_count += 1
+            tts_audio_bytes += len(tts_chunk)
+        tts_chunk_total += chunk_count
+        t_tts = (time.perf_counter() - t0) * 1000
+        tts_timings.append(t_tts)
+        t_e2e = (time.perf_counter() - start) * 1000
+        e2e_timings.append(t_e2e)
+        print(f"  🔊 TTS: {chunk_count} chunks  (TTS: {t_tts:.0f}ms, E2E: {t_e2e:.0f}ms)")
+
+    async def mt_worker() -> None:
+        while True:
+            items = await take_batch(mt_queue)
+            done = items[-1] is None
+            if done:
+                items.pop()
+            if items:
+                # All pending segments go to the model in one batched call
+                t0 = time.perf_counter()
+                translations = await mt_engine.translate_batch(
+                    [text for text, _ in items], src_lang, tgt_lang
+                )
+                t_mt = (time.perf_counter() - t0) * 1000
+                for (_, start), translation in zip(items, translations):
                     mt_timings.append(t_mt)
                     if translation:
                         translated_texts.append(translation)
-                        print(f"  🌍 Translated: \"{translation}\"  (MT: {t_mt:.0f}ms)")
+                        print(f"  🌍 Translated: \"{translation}\"  (MT: {t_mt:.0f}ms, batch of {len(items)})")
+                        await tts_queue.put((translation, start))
+                    else:
+                        e2e_timings.append((time.perf_counter() - start) * 1000)
+            if done:
+                await tts_queue.put(None)
+                return
+
+    async def tts_worker() -> None:
+        while True:
+            items = await take_batch(tts_queue)
+            done = items[-1] is None
+            if done:
+                items.pop()
+            await asyncio.gather(*(synthesize_one(text, start) for text, start in items))
+            if done:
+                return
+
+    stage_tasks = [asyncio.create_task(mt_worker()), asyncio.create_task(tts_worker())]
+
+    # ── Speculative MT: once the uncommitted tail holds for a tick (a pause,
+    #    about to be committed), start translating it.  The engine caches
+    #    finished translations and shares in-flight ones, so the commit with
+    #    the same text does not run the model again.  At most one speculative
+    #    request is in flight, so they never pile up ahead of real commits.
+    speculative_mt = speculative_mt and src_lang != tgt_lang
+    speculative_task: asyncio.Task | None = None
+    speculative_text = ""
+    prev_tail = ""
+    speculative_runs = 0
+    run_start = time.perf_counter()
+
+    # ASR only reads the buffer once per interval, so each interval's
+    # chunks go in as one block (row views of one reshape): the buffer
+    # holds the same audio at every tick as with per-chunk appends.
+    # Chunks after the last full interval would never be decoded.
+    interval_size = chunks_per_interval * chunk_size
+    n_ticks = total_chunks // chunks_per_interval
+    blocks = audio_float[: n_ticks * interval_size].reshape(n_ticks, interval_size)
+    for block in blocks:
+        audio_buffer.append(block)
 
-                        t0 = time.perf_counter()
-                        chunk_count = 0
-                        async for tts_chunk in tts_engine.synthesize_streaming(translation, lang=tgt_lang):
-                            tts_audio_chunks.append(tts_chunk)
-                            chunk_count += 1
-                        t_tts = (time.perf_counter() - t0) * 1000
-                        tts_timings.append(t_tts)
-                        print(f"  🔊 TTS: {chunk_count} chunks  (TTS: {t_tts:.0f}ms)")
+        chunk_start_time = time.perf_counter()
+        audio_window = audio_buffer.get_last(WINDOW_SEC)
+        if audio_window is None or len(audio_window) < sample_rate * 0.5:
+            continue
 
-                    t_e2e = (time.perf_counter() - chunk_start_time) * 1000
-                    e2e_timings.append(t_e2e)
-                    print(f"  ⏱️  E2E: {t_e2e:.0f}ms")
+        # Same energy gate as the server's ASR loop: silent windows never
+        # reach the model
+        rms = _compute_rms(audio_window)
+        if rms < _SILENCE_RMS_THRESHOLD:
+            silent_windows += 1
+            continue
+
+        t0 = time.perf_counter()
+        hypothesis = await asr_engine.transcribe(audio_window, language=src_lang, rms=rms)
+        t_asr = (time.perf_counter() - t0) * 1000
+        asr_timings.append(t_asr)
+
+        if hypothesis:
+            commit_events = commit_tracker.update(hypothesis)
+            for ev in commit_events:
+                committed_texts.append(ev.text)
+                print(f"\n  📝 Committed: \"{ev.text}\"  (ASR: {t_asr:.0f}ms)")
+                await mt_queue.put((ev.text, chunk_start_time))
+
+            tail = commit_tracker.effective_uncommitted_text
+            if (
+                speculative_mt
+                and tail
+                and tail == prev_tail
+                and tail != speculative_text
+                and (speculative_task is None or speculative_task.done())
+            ):
+                speculative_text = tail
+                speculative_task = asyncio.create_task(
+                    mt_engine.translate(tail, src_lang, tgt_lang)
+                )
+                speculative_runs += 1
+            prev_tail = tail
+
+    await mt_queue.put(None)
+    await asyncio.gather(*stage_tasks)
+    if speculative_task is not None:
+        await speculative_task
+    run_ms = (time.perf_counter() - run_start) * 1000
 
     # ── Report ──
-    print(f"\n{'='*60}")
-    print("📊 Pipeline Test Results")
-    print(f"{'='*60}")
-    print(f"\n  Audio duration:     {len(audio_float)/sample_rate:.2f}s")
-    print(f"  Chunks processed:   {total_chunks}")
-    print(f"  Committed segments: {len(committed_texts)}")
-    print(f"  Translated segments:{len(translated_texts)}")
-    print(f"  TTS audio chunks:   {len(tts_audio_chunks)}")
+    # Assembled first and written with a single print
+    def latency_line(label: str, timings: list[float]) -> str:
+        t = np.asarray(timings)
+        return f"  {label}avg={t.mean():.0f}ms  min={t.min():.0f}ms  max={t.max():.0f}ms"
+
+    tts_audio_sec = tts_audio_bytes / 2 / tts_engine.output_sample_rate
+    rule = "=" * 60
+    report = [
+        f"\n{rule}",
+        "📊 Pipeline Test Results",
+        rule,
+        f"\n  Audio duration:     {duration_sec:.2f}s",
+        f"  Chunks processed:   {total_chunks}",
+        f"  Silent windows:     {silent_windows} (ASR skipped)",
+        f"  Committed segments: {len(committed_texts)}",
+        f"  Translated segments:{len(translated_texts)}",
+        f"  Speculative MT:     {speculative_runs} requests" if speculative_mt else "  Speculative MT:     off",
+        f"  TTS audio chunks:   {tts_chunk_total} ({tts_audio_sec:.2f}s of audio)",
+        f"  Pipeline wall time: {run_ms:.0f}ms (stages overlap)",
+    ]
     if asr_timings:
-        print(f"\n  ASR latency:  avg={np.mean(asr_timings):.0f}ms  min={np.min(asr_timings):.0f}ms  max={np.max(asr_timings):.0f}ms")
+        report.append("\n" + latency_line("ASR latency:  ", asr_timings))
     if mt_timings:
-        print(f"  MT latency:   avg={np.mean(mt_timings):.0f}ms  min={np.min(mt_timings):.0f}ms  max={np.max(mt_timings):.0f}ms")
+        report.append(latency_line("MT latency:   ", mt_timings))
     if tts_timings:
-        print(f"  TTS latency:  avg={np.mean(tts_timings):.0f}ms  min={np.min(tts_timings):.0f}ms  max={np.max(tts_timings):.0f}ms")
+        report.append(latency_line("TTS latency:  ", tts_timings))
     if e2e_timings:
-        print(f"  E2E latency:  avg={np.mean(e2e_timings):.0f}ms  min={np.min(e2e_timings):.0f}ms  max={np.max(e2e_timings):.0f}ms")
+        report.append(latency_line("E2E latency:  ", e2e_timings))
     if not committed_texts:
-        print("\n  ⚠️  No segments were committed. For real speech, the pipeline would commit text.")
-        print("     With a synthetic sine wave, no speech is detected — this is expected behavior.")
-    print(f"\n{'='*60}")
-    print("✅ Pipeline test complete!")
-    print(f"{'='*60}\n")
+        report.append("\n  ⚠️  No segments were committed. For real speech, the pipeline would commit text.")
+        report.append("     With a synthetic sine wave, no speech is detected — this is expected behavior.")
+    report += [f"\n{rule}", "✅ Pipeline test complete!", f"{rule}\n"]
+    print("\n".join(report))
 
 
 def main():
@@ -195,8 +420,15 @@ def main():
     parser.add_argument("--input", "-i", type=str, default=None, help="Path to input .wav file")
     parser.add_argument("--src-lang", default="es", help="Source language code (default: es)")
     parser.add_argument("--tgt-lang", default="en", help="Target language code (default: en)")
+    parser.add_argument(
+        "--no-speculative-mt",
+        action="store_true",
+        help="Only translate committed text (no speculative MT on partial hypotheses)",
+    )
     args = parser.parse_args()
-    asyncio.run(test_pipeline(args.input, args.src_lang, args.tgt_lang))
+    asyncio.run(test_pipeline(
+        args.input, args.src_lang, args.tgt_lang, speculative_mt=not args.no_speculative_mt
+    ))
 
 
 if __name__ == "__main__":